@@ -5,27 +5,332 @@ contradiction finding, relationship analysis, and summarization.
 """
 
 import re
-from typing import List, Dict, Any, Optional
+import string
+import threading
+import time
+from functools import lru_cache
+from itertools import combinations
+from collections import Counter, OrderedDict, defaultdict
+from typing import List, Dict, Any, Optional, Hashable, Union
 from datetime import datetime
+import numpy as np
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+
+# Precompiled patterns shared by all analyzer instances
+_DATE_PATTERNS = [
+    r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
+    r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',
+    r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
+]
+_DATE_RE = re.compile("|".join(_DATE_PATTERNS))
+
+_PARTY_RES = [
+    re.compile(r'(?:Plaintiff|Defendant|Appellant|Appellee|Petitioner|Respondent)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'),
+    re.compile(r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s+v\.'),
+    re.compile(r'(?:Mr\.|Ms\.|Mrs\.|Dr\.)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)'),
+]
+
+_SENT_SPLIT_RE = re.compile(r'[.!?]+')
+_TERM_PUNCTUATION = string.punctuation
+
+# RICO indicator categories and the keywords that signal them
+_RICO_CATEGORY_KEYWORDS = {
+    'enterprise': ['enterprise', 'organization', 'entity', 'business', 'company'],
+    'pattern': ['pattern', 'repeated', 'systematic', 'ongoing'],
+    'coordination': ['coordinate', 'conspire', 'collaborate', 'together', 'joint'],
+    'transaction': ['transaction', 'payment', 'transfer', 'exchange', 'deal'],
+    'communication': ['email', 'communication', 'message', 'call', 'meeting', 'discuss'],
+}
+
+# Question words dropped to form the keyword-only variant of a question
+_QUESTION_STOPWORDS = frozenset({
+    'a', 'an', 'the', 'what', 'which', 'who', 'whom', 'when', 'where', 'why', 'how',
+    'is', 'are', 'was', 'were', 'do', 'does', 'did', 'can', 'could', 'should', 'would',
+    'there', 'any', 'of', 'to', 'in', 'on', 'for', 'about', 'with', 'me', 'show', 'tell',
+})
+
+# Report headings for each RICO indicator category
+_RICO_CATEGORY_TITLES = {
+    'enterprise': 'Enterprise Indicators',
+    'pattern': 'Pattern of Activity Indicators',
+    'coordination': 'Coordination Indicators',
+    'transaction': 'Transaction Indicators',
+    'communication': 'Communication Indicators',
+}
+
+# Documents whose RICO categories are remembered between analyses (a doc_id and a few names each)
+RICO_SCAN_CACHE_SIZE = 50_000
+
+# One case-insensitive alternation per category (used when pyahocorasick is unavailable)
+_RICO_CATEGORY_RES = {
+    category: re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+    for category, keywords in _RICO_CATEGORY_KEYWORDS.items()
+}
+
+
+class PreparedDocs:
+    """Search results unpacked once into parallel per-field lists for the analyses"""
+    
+    def __init__(self, documents: List[Dict[str, Any]]):
+        metadatas = [doc.get('metadata', {}) for doc in documents]
+        self.doc_ids = [doc.get('doc_id') for doc in documents]
+        self.contents = [doc.get('content', '') for doc in documents]
+        self.file_names = [metadata.get('file_name', 'Unknown') for metadata in metadatas]
+        self.doc_types = [metadata.get('doc_type', 'Unknown') for metadata in metadatas]
+        self.dates = [metadata.get('dates', []) for metadata in metadatas]
+        self._sentences = None
+    
+    @classmethod
+    def from_documents(cls, documents) -> "PreparedDocs":
+        """Return documents as PreparedDocs, preparing them if needed"""
+        return documents if isinstance(documents, cls) else cls(documents or [])
+    
+    @property
+    def sentences(self) -> List[List[str]]:
+        """Raw sentences of each document, split on first use and shared by every analysis of the run"""
+        if self._sentences is None:
+            self._sentences = [_SENT_SPLIT_RE.split(content) for content in self.contents]
+        return self._sentences
+    
+    def __len__(self) -> int:
+        return len(self.contents)
+
+
+# Analyses accept raw search results or documents already prepared by the caller
+Documents = Union[List[Dict[str, Any]], PreparedDocs]
+
+
+class SemanticCache:
+    """Bounded LRU cache of answers looked up by exact query text or query-embedding similarity
+    
+    Safe to share between request threads: every lookup and update holds the cache lock.
+    """
+    
+    def __init__(self, threshold: float = 0.85, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (scope, unit embedding or None, answer, stored_at, text key)
+        self._exact = {}  # (scope, normalized query text) -> key
+        self._next_key = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _text_key(text: str) -> str:
+        return ' '.join(text.lower().split())
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+    
+    def _evict_expired(self):
+        if self.ttl_seconds is None:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry[3] < cutoff]
+        for key in expired:
+            self._drop(key, self._entries.pop(key))
+    
+    def _drop(self, key: int, entry: tuple):
+        """Forget the exact-text mapping of a removed entry"""
+        exact_key = (entry[0], entry[4])
+        if self._exact.get(exact_key) == key:
+            del self._exact[exact_key]
+    
+    def get_exact(self, text: str, scope: Hashable = None) -> Optional[Any]:
+        """Return the answer cached for the same query text (case/whitespace-insensitive), or None"""
+        text_key = self._text_key(text)
+        with self._lock:
+            self._evict_expired()
+            key = self._exact.get((scope, text_key))
+            if key is None:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][2]
+    
+    def get(self, embedding: np.ndarray, scope: Hashable = None) -> Optional[Any]:
+        """Return a cached answer whose query is similar enough, or None"""
+        query = self._normalize(embedding)
+        with self._lock:
+            self._evict_expired()
+            keys = [key for key, entry in self._entries.items() if entry[0] == scope and entry[1] is not None]
+            if not keys:
+                return None
+            
+            matrix = np.vstack([self._entries[key][1] for key in keys])
+            similarities = matrix @ query
+            best = int(np.argmax(similarities))
+            if not similarities[best] >= self.threshold:
+                return None
+            
+            key = keys[best]
+            self._entries.move_to_end(key)
+            return self._entries[key][2]
+    
+    def put(self, embedding: Optional[np.ndarray], answer: Any, scope: Hashable = None,
+            text: Optional[str] = None):
+        """Store an answer for the query embedding and/or exact query text"""
+        text_key = self._text_key(text) if text is not None else None
+        vector = self._normalize(embedding) if embedding is not None else None
+        with self._lock:
+            self._entries[self._next_key] = (scope, vector, answer, time.monotonic(), text_key)
+            if text_key is not None:
+                self._exact[(scope, text_key)] = self._next_key
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._drop(*self._entries.popitem(last=False))
+    
+    def clear(self):
+        """Drop all cached answers"""
+        with self._lock:
+            self._entries.clear()
+            self._exact.clear()
 
 
 class AIAnalyzer:
     """AI-powered analysis for legal documents"""
     
-    def __init__(self):
+    def __init__(self, enable_cache: bool = False, cache_threshold: float = 0.85,
+                 cache_ttl_seconds: float = 3600, expand_queries: bool = False):
+        # Also search a keyword-only variant of each question and fuse the rankings (costs a
+        # second search per question and changes which documents are returned)
+        self.expand_queries = expand_queries
         self.rico_keywords = [
             'enterprise', 'pattern', 'racketeering', 'conspiracy',
             'coordination', 'scheme', 'fraud', 'transaction',
             'communication', 'timing', 'actor', 'participant'
         ]
+        
+        # Single multi-pattern scanner over every RICO category keyword:
+        # Hyperscan when installed, otherwise an Aho-Corasick automaton
+        self._rico_categories_by_id = list(_RICO_CATEGORY_KEYWORDS)
+        self._rico_hyperscan_db = None
+        self._rico_hyperscan_lock = threading.Lock()
+        self._rico_automaton = None
+        if HYPERSCAN_AVAILABLE:
+            try:
+                self._rico_hyperscan_db = self._build_rico_hyperscan_db()
+            except Exception as e:
+                print(f"Warning: Could not compile Hyperscan database: {e}")
+        if self._rico_hyperscan_db is None and AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for category, keywords in _RICO_CATEGORY_KEYWORDS.items():
+                for keyword in keywords:
+                    automaton.add_word(keyword, (category, keyword))
+            automaton.make_automaton()
+            self._rico_automaton = automaton
+        # Top results overlap from one RICO query to the next, so each document is scanned once.
+        # Keyed by doc_id, which is a hash of the content, so the text itself is not kept.
+        self._rico_category_cache = OrderedDict()  # doc_id -> frozenset of categories, LRU
+        self._rico_category_lock = threading.Lock()
+        
+        # Optional semantic answer cache for answer_question
+        self.answer_cache = SemanticCache(
+            threshold=cache_threshold, ttl_seconds=cache_ttl_seconds
+        ) if enable_cache else None
+    
+    def _build_rico_hyperscan_db(self):
+        """Compile all RICO keywords into one Hyperscan block-mode database"""
+        expressions, ids = [], []
+        for category_id, category in enumerate(self._rico_categories_by_id):
+            for keyword in _RICO_CATEGORY_KEYWORDS[category]:
+                expressions.append(re.escape(keyword).encode('utf-8'))
+                ids.append(category_id)
+        
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(expressions=expressions, ids=ids, elements=len(expressions), flags=[flags] * len(expressions))
+        return db
+    
+    def _rico_categories(self, doc_id: Optional[str], content: str) -> frozenset:
+        """RICO indicator categories of a document, scanned once per doc_id"""
+        if doc_id is None:
+            return self._scan_rico_categories(content)
+        with self._rico_category_lock:
+            categories = self._rico_category_cache.get(doc_id)
+            if categories is not None:
+                self._rico_category_cache.move_to_end(doc_id)
+                return categories
+        
+        categories = self._scan_rico_categories(content)
+        with self._rico_category_lock:
+            self._rico_category_cache[doc_id] = categories
+            while len(self._rico_category_cache) > RICO_SCAN_CACHE_SIZE:
+                self._rico_category_cache.popitem(last=False)
+        return categories
+    
+    def _scan_rico_categories(self, content: str) -> frozenset:
+        """Return the RICO indicator categories whose keywords appear in content"""
+        if self._rico_hyperscan_db is not None:
+            found = set()
+            total = len(self._rico_categories_by_id)
+            
+            def on_match(category_id, start, end, flags, context):
+                found.add(self._rico_categories_by_id[category_id])
+                # Stop scanning once every category has been seen
+                return len(found) == total
+            
+            # A database owns one scratch space, so scans must not overlap across threads
+            with self._rico_hyperscan_lock:
+                try:
+                    self._rico_hyperscan_db.scan(content.encode('utf-8'), match_event_handler=on_match)
+                except hyperscan.ScanTerminated:
+                    pass
+            return frozenset(found)
+        
+        if self._rico_automaton is not None:
+            found = set()
+            total = len(self._rico_categories_by_id)
+            for _, (category, _) in self._rico_automaton.iter(content.lower()):
+                found.add(category)
+                # Every category already hit; the rest of the document cannot add more
+                if len(found) == total:
+                    break
+            return frozenset(found)
+        
+        return frozenset(
+            category for category, pattern in _RICO_CATEGORY_RES.items()
+            if pattern.search(content)
+        )
     
     def answer_question(self, question: str, knowledge_base, chat_history: List = None) -> str:
         """Generate comprehensive answer to a question based on knowledge base"""
         if chat_history is None:
             chat_history = []
         
-        # Search knowledge base for relevant documents
-        results = knowledge_base.semantic_search(question, top_k=5)
+        # Serve repeats (exact text, no embedding needed) and paraphrases of recent questions
+        # from the cache. Answers depend only on the question and the documents (not on the
+        # chat history), so the scope is the knowledge base state.
+        if self.answer_cache is not None:
+            cache_scope = getattr(knowledge_base, 'version', len(knowledge_base.documents))
+            cached_answer = self.answer_cache.get_exact(question, cache_scope)
+            if cached_answer is not None:
+                return cached_answer
+            query_embedding = knowledge_base.embed(question)
+            cached_answer = self.answer_cache.get(query_embedding, cache_scope)
+            if cached_answer is not None:
+                return cached_answer
+        
+        # Search knowledge base for relevant documents; all query variants go in one batch
+        queries = self._expand_query(question) if self.expand_queries else [question]
+        if len(queries) > 1:
+            results = self._merge_rrf(knowledge_base.semantic_search_batch(queries, top_k=5), top_k=5)
+        else:
+            results = knowledge_base.semantic_search(question, top_k=5)
         
         if not results:
             return "I couldn't find any relevant documents to answer your question. Please upload documents first."
@@ -48,47 +353,80 @@ class AIAnalyzer:
         context = "\n".join(context_parts)
         
         # Generate answer (simplified - in production, use an LLM)
-        answer = f"""Based on the documents in the knowledge base, here's what I found:
+        answer_parts = [f"""Based on the documents in the knowledge base, here's what I found:
 
 **Question:** {question}
 
 **Relevant Documents Found:** {len(results)}
 
 **Answer:**
-"""
+"""]
         
         # Extract key information from context
-        if 'timeline' in question.lower() or 'when' in question.lower():
+        question_lower = question.lower()
+        if 'timeline' in question_lower or 'when' in question_lower:
             dates = self._extract_dates_from_context(context)
             if dates:
-                answer += f"\n**Key Dates Found:**\n"
+                answer_parts.append(f"\n**Key Dates Found:**\n")
                 for date in dates[:10]:
-                    answer += f"- {date}\n"
+                    answer_parts.append(f"- {date}\n")
         
-        if 'who' in question.lower() or 'people' in question.lower() or 'parties' in question.lower():
+        if 'who' in question_lower or 'people' in question_lower or 'parties' in question_lower:
             parties = self._extract_parties_from_context(context)
             if parties:
-                answer += f"\n**Parties/People Mentioned:**\n"
+                answer_parts.append(f"\n**Parties/People Mentioned:**\n")
                 for party in parties[:10]:
-                    answer += f"- {party}\n"
+                    answer_parts.append(f"- {party}\n")
         
         # Add summary of relevant content
-        answer += f"\n**Summary:**\n"
-        answer += self._summarize_context(context, question)
+        answer_parts.append(f"\n**Summary:**\n")
+        answer_parts.append(self._summarize_context(context, question))
         
-        answer += f"\n\n**Source Documents:**\n"
+        answer_parts.append(f"\n\n**Source Documents:**\n")
         for i, result in enumerate(results, 1):
             doc_info = result.get('metadata', {})
-            answer += f"{i}. {doc_info.get('file_name', 'Unknown')} (Relevance: {result.get('score', 0):.3f})\n"
+            answer_parts.append(f"{i}. {doc_info.get('file_name', 'Unknown')} (Relevance: {result.get('score', 0):.3f})\n")
+        
+        answer = "".join(answer_parts)
+        if self.answer_cache is not None:
+            self.answer_cache.put(query_embedding, answer, cache_scope, text=question)
         
         return answer
     
-    def detect_rico_patterns(self, query: str, documents: List[Dict[str, Any]]) -> str:
+    @staticmethod
+    def _expand_query(question: str) -> List[str]:
+        """Return the question plus a keyword-only variant when it differs"""
+        keywords = [
+            word for word in question.split()
+            if word.strip('?.,!').lower() not in _QUESTION_STOPWORDS
+        ]
+        variant = " ".join(keywords)
+        if variant and variant != question.strip():
+            return [question, variant]
+        return [question]
+    
+    @staticmethod
+    def _merge_rrf(result_lists: List[List[Dict[str, Any]]], top_k: int = 5, k: int = 60) -> List[Dict[str, Any]]:
+        """Merge ranked result lists with reciprocal rank fusion, keeping each document's best score"""
+        fused = {}
+        best = {}
+        for results in result_lists:
+            for rank, result in enumerate(results):
+                key = result.get('doc_id') or result.get('metadata', {}).get('file_name', '')
+                fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank + 1)
+                if key not in best or result.get('score', 0) > best[key].get('score', 0):
+                    best[key] = result
+        
+        ranked = sorted(fused, key=fused.get, reverse=True)
+        return [best[key] for key in ranked[:top_k]]
+    
+    def detect_rico_patterns(self, query: str, documents: Documents) -> str:
         """Detect potential RICO-related patterns"""
+        documents = PreparedDocs.from_documents(documents)
         if not documents:
             return "No documents found for RICO analysis."
         
-        analysis = f"""# RICO Pattern Analysis
+        analysis_parts = [f"""# RICO Pattern Analysis
 
 **Query:** {query}
 
@@ -96,104 +434,50 @@ class AIAnalyzer:
 
 ## Potential RICO Elements Detected:
 
-"""
+"""]
         
-        # Analyze for RICO elements
-        enterprise_indicators = []
-        pattern_indicators = []
-        coordination_indicators = []
-        transaction_indicators = []
-        communication_indicators = []
-        
-        for doc in documents:
-            content = doc.get('content', '').lower()
-            metadata = doc.get('metadata', {})
-            file_name = metadata.get('file_name', 'Unknown')
-            
-            # Check for enterprise indicators
-            if any(keyword in content for keyword in ['enterprise', 'organization', 'entity', 'business', 'company']):
-                enterprise_indicators.append(file_name)
-            
-            # Check for pattern indicators
-            if any(keyword in content for keyword in ['pattern', 'repeated', 'systematic', 'ongoing']):
-                pattern_indicators.append(file_name)
-            
-            # Check for coordination indicators
-            if any(keyword in content for keyword in ['coordinate', 'conspire', 'collaborate', 'together', 'joint']):
-                coordination_indicators.append(file_name)
-            
-            # Check for transaction indicators
-            if any(keyword in content for keyword in ['transaction', 'payment', 'transfer', 'exchange', 'deal']):
-                transaction_indicators.append(file_name)
-            
-            # Check for communication indicators
-            if any(keyword in content for keyword in ['email', 'communication', 'message', 'call', 'meeting', 'discuss']):
-                communication_indicators.append(file_name)
+        # Analyze for RICO elements and collect dates in a single pass over the documents
+        indicators = {category: Counter() for category in _RICO_CATEGORY_KEYWORDS}
+        unique_dates = set()
+        
+        for doc_id, content, file_name, dates in zip(documents.doc_ids, documents.contents,
+                                                     documents.file_names, documents.dates):
+            for category in self._rico_categories(doc_id, content):
+                indicators[category][file_name] += 1
+            unique_dates.update(dates)
         
         # Build analysis report
-        if enterprise_indicators:
-            analysis += f"### Enterprise Indicators\n"
-            analysis += f"Found in {len(set(enterprise_indicators))} document(s):\n"
-            for doc in set(enterprise_indicators)[:5]:
-                analysis += f"- {doc}\n"
-            analysis += "\n"
-        
-        if pattern_indicators:
-            analysis += f"### Pattern of Activity Indicators\n"
-            analysis += f"Found in {len(set(pattern_indicators))} document(s):\n"
-            for doc in set(pattern_indicators)[:5]:
-                analysis += f"- {doc}\n"
-            analysis += "\n"
-        
-        if coordination_indicators:
-            analysis += f"### Coordination Indicators\n"
-            analysis += f"Found in {len(set(coordination_indicators))} document(s):\n"
-            for doc in set(coordination_indicators)[:5]:
-                analysis += f"- {doc}\n"
-            analysis += "\n"
-        
-        if transaction_indicators:
-            analysis += f"### Transaction Indicators\n"
-            analysis += f"Found in {len(set(transaction_indicators))} document(s):\n"
-            for doc in set(transaction_indicators)[:5]:
-                analysis += f"- {doc}\n"
-            analysis += "\n"
-        
-        if communication_indicators:
-            analysis += f"### Communication Indicators\n"
-            analysis += f"Found in {len(set(communication_indicators))} document(s):\n"
-            for doc in set(communication_indicators)[:5]:
-                analysis += f"- {doc}\n"
-            analysis += "\n"
-        
-        # Extract dates for timeline analysis
-        all_dates = []
-        for doc in documents:
-            metadata = doc.get('metadata', {})
-            dates = metadata.get('dates', [])
-            all_dates.extend(dates)
-        
-        if all_dates:
-            analysis += f"### Timeline Analysis\n"
-            analysis += f"Found {len(set(all_dates))} unique dates across documents.\n"
-            analysis += f"Date range: {min(set(all_dates))} to {max(set(all_dates))}\n"
-            analysis += "\n"
+        for category, title in _RICO_CATEGORY_TITLES.items():
+            category_indicators = indicators[category]
+            if category_indicators:
+                analysis_parts.append(f"### {title}\n")
+                analysis_parts.append(f"Found in {len(category_indicators)} document(s):\n")
+                for doc, _ in category_indicators.most_common(5):
+                    analysis_parts.append(f"- {doc}\n")
+                analysis_parts.append("\n")
+        
+        if unique_dates:
+            analysis_parts.append(f"### Timeline Analysis\n")
+            analysis_parts.append(f"Found {len(unique_dates)} unique dates across documents.\n")
+            analysis_parts.append(f"Date range: {min(unique_dates)} to {max(unique_dates)}\n")
+            analysis_parts.append("\n")
         
         # Recommendations
-        analysis += f"## Recommendations\n"
-        analysis += f"- Review documents with multiple RICO indicators for detailed analysis\n"
-        analysis += f"- Build detailed timeline of events involving identified parties\n"
-        analysis += f"- Examine communications and transactions for coordination patterns\n"
-        analysis += f"- Look for repeated patterns of activity over time\n"
+        analysis_parts.append(f"## Recommendations\n")
+        analysis_parts.append(f"- Review documents with multiple RICO indicators for detailed analysis\n")
+        analysis_parts.append(f"- Build detailed timeline of events involving identified parties\n")
+        analysis_parts.append(f"- Examine communications and transactions for coordination patterns\n")
+        analysis_parts.append(f"- Look for repeated patterns of activity over time\n")
         
-        return analysis
+        return "".join(analysis_parts)
     
-    def find_contradictions(self, query: str, documents: List[Dict[str, Any]]) -> str:
+    def find_contradictions(self, query: str, documents: Documents) -> str:
         """Find contradictory statements in documents"""
+        documents = PreparedDocs.from_documents(documents)
         if not documents:
             return "No documents found for contradiction analysis."
         
-        analysis = f"""# Contradiction Analysis
+        analysis_parts = [f"""# Contradiction Analysis
 
 **Query:** {query}
 
@@ -201,60 +485,44 @@ class AIAnalyzer:
 
 ## Potential Contradictions:
 
-"""
+"""]
         
         # Simple contradiction detection based on keyword analysis
         # In production, use more sophisticated NLP techniques
         
-        contradictions = []
-        
-        # Extract key facts from each document
-        facts = []
-        for doc in documents:
-            content = doc.get('content', '')
-            metadata = doc.get('metadata', {})
-            file_name = metadata.get('file_name', 'Unknown')
-            
-            # Extract statements (simplified)
-            sentences = re.split(r'[.!?]+', content)
-            for sentence in sentences[:20]:  # Limit to first 20 sentences
-                if len(sentence.strip()) > 20:  # Only meaningful sentences
-                    facts.append({
-                        'statement': sentence.strip(),
-                        'source': file_name,
-                        'content': content[:500]
-                    })
+        # Extract key facts from each document, grouped by source
+        by_source = {}
+        fact_count = 0
+        for file_name, doc_sentences in zip(documents.file_names, documents.sentences):
+            # Extract statements (simplified): meaningful sentences among the first 20
+            statements = [sentence for sentence in map(str.strip, doc_sentences[:20]) if len(sentence) > 20]
+            if statements:
+                by_source.setdefault(file_name, []).extend(statements)
+                fact_count += len(statements)
         
         # Look for contradictory patterns (simplified)
         # In production, use semantic similarity and contradiction detection models
         
-        if len(facts) > 1:
-            analysis += f"Analyzed {len(facts)} statements across {len(documents)} documents.\n\n"
-            analysis += "**Note:** This is a simplified analysis. For comprehensive contradiction detection, "
-            analysis += "consider using advanced NLP models that can detect semantic contradictions.\n\n"
+        if fact_count > 1:
+            analysis_parts.append(f"Analyzed {fact_count} statements across {len(documents)} documents.\n\n")
+            analysis_parts.append("**Note:** This is a simplified analysis. For comprehensive contradiction detection, ")
+            analysis_parts.append("consider using advanced NLP models that can detect semantic contradictions.\n\n")
             
-            # Group by source
-            by_source = {}
-            for fact in facts:
-                source = fact['source']
-                if source not in by_source:
-                    by_source[source] = []
-                by_source[source].append(fact['statement'])
-            
-            analysis += "**Statements by Document:**\n"
+            analysis_parts.append("**Statements by Document:**\n")
             for source, statements in list(by_source.items())[:5]:
-                analysis += f"\n**{source}:**\n"
+                analysis_parts.append(f"\n**{source}:**\n")
                 for stmt in statements[:3]:
-                    analysis += f"- {stmt[:200]}...\n"
+                    analysis_parts.append(f"- {stmt[:200]}...\n")
         
-        return analysis
+        return "".join(analysis_parts)
     
-    def analyze_relationships(self, entities: List[str], documents: List[Dict[str, Any]]) -> str:
+    def analyze_relationships(self, entities: List[str], documents: Documents) -> str:
         """Analyze relationships between entities"""
+        documents = PreparedDocs.from_documents(documents)
         if not entities or not documents:
             return "Please provide entities and ensure documents are available."
         
-        analysis = f"""# Relationship Analysis
+        analysis_parts = [f"""# Relationship Analysis
 
 **Entities:** {', '.join(entities)}
 
@@ -262,150 +530,182 @@ class AIAnalyzer:
 
 ## Relationships Found:
 
-"""
+"""]
         
         # Find co-occurrences
-        relationships = {}
+        relationships = defaultdict(list)
+        
+        entities_lower = [e.lower() for e in entities]
+        entity_automaton = None
+        entity_patterns = None
+        if AHOCORASICK_AVAILABLE and any(entities_lower):
+            entity_automaton = ahocorasick.Automaton()
+            for entity_lower in entities_lower:
+                if entity_lower:
+                    entity_automaton.add_word(entity_lower, entity_lower)
+            entity_automaton.make_automaton()
+        else:
+            entity_patterns = [re.compile(re.escape(e), re.IGNORECASE) for e in entities]
         
-        for doc in documents:
-            content = doc.get('content', '')
-            metadata = doc.get('metadata', {})
-            file_name = metadata.get('file_name', 'Unknown')
-            
+        for content, file_name in zip(documents.contents, documents.file_names):
             # Find which entities are mentioned together
-            mentioned_entities = [e for e in entities if e.lower() in content.lower()]
+            if entity_automaton is not None:
+                present = {found for _, found in entity_automaton.iter(content.lower())}
+                mentioned_entities = [e for e, el in zip(entities, entities_lower) if el in present]
+            else:
+                mentioned_entities = [e for e, pattern in zip(entities, entity_patterns) if pattern.search(content)]
             
             if len(mentioned_entities) > 1:
                 # Create relationship pairs
-                for i, entity1 in enumerate(mentioned_entities):
-                    for entity2 in mentioned_entities[i+1:]:
-                        pair = tuple(sorted([entity1, entity2]))
-                        if pair not in relationships:
-                            relationships[pair] = []
-                        relationships[pair].append(file_name)
+                for entity1, entity2 in combinations(mentioned_entities, 2):
+                    pair = (entity1, entity2) if entity1 < entity2 else (entity2, entity1)
+                    relationships[pair].append(file_name)
         
         if relationships:
             for (entity1, entity2), docs in relationships.items():
-                analysis += f"### {entity1} ↔ {entity2}\n"
-                analysis += f"**Co-occurrences:** {len(docs)} document(s)\n"
-                analysis += f"**Documents:**\n"
-                for doc in set(docs)[:5]:
-                    analysis += f"- {doc}\n"
-                analysis += "\n"
+                analysis_parts.append(f"### {entity1} ↔ {entity2}\n")
+                analysis_parts.append(f"**Co-occurrences:** {len(docs)} document(s)\n")
+                analysis_parts.append(f"**Documents:**\n")
+                for doc, _ in Counter(docs).most_common(5):
+                    analysis_parts.append(f"- {doc}\n")
+                analysis_parts.append("\n")
         else:
-            analysis += "No direct relationships found between the specified entities in the analyzed documents.\n"
+            analysis_parts.append("No direct relationships found between the specified entities in the analyzed documents.\n")
         
         # Extract dates for timeline
-        all_dates = []
-        for doc in documents:
-            metadata = doc.get('metadata', {})
-            dates = metadata.get('dates', [])
-            all_dates.extend(dates)
+        unique_dates = set()
+        for dates in documents.dates:
+            unique_dates.update(dates)
         
-        if all_dates:
-            analysis += f"\n## Timeline Context\n"
-            analysis += f"Found {len(set(all_dates))} unique dates in related documents.\n"
+        if unique_dates:
+            analysis_parts.append(f"\n## Timeline Context\n")
+            analysis_parts.append(f"Found {len(unique_dates)} unique dates in related documents.\n")
         
-        return analysis
+        return "".join(analysis_parts)
     
-    def generate_summary(self, documents: List[Dict[str, Any]], summary_type: str = "general") -> str:
+    def generate_summary(self, documents: Documents, summary_type: str = "general") -> str:
         """Generate summary of documents"""
+        documents = PreparedDocs.from_documents(documents)
         if not documents:
             return "No documents provided for summarization."
         
-        summary = f"""# Document Summary
+        summary_parts = [f"""# Document Summary
 
 **Summary Type:** {summary_type.title()}
 **Documents Summarized:** {len(documents)}
 
-"""
+"""]
         
         if summary_type == "executive":
-            summary += "## Executive Summary\n\n"
-            summary += "Key points from the documents:\n\n"
+            summary_parts.append("## Executive Summary\n\n")
+            summary_parts.append("Key points from the documents:\n\n")
         elif summary_type == "detailed":
-            summary += "## Detailed Summary\n\n"
+            summary_parts.append("## Detailed Summary\n\n")
         else:
-            summary += "## General Summary\n\n"
+            summary_parts.append("## General Summary\n\n")
         
         # Summarize each document
-        for i, doc in enumerate(documents, 1):
-            content = doc.get('content', '')
-            metadata = doc.get('metadata', {})
-            file_name = metadata.get('file_name', 'Unknown')
-            doc_type = metadata.get('doc_type', 'Unknown')
-            
-            summary += f"### Document {i}: {file_name}\n"
-            summary += f"**Type:** {doc_type}\n\n"
+        for i, (content, file_name, doc_type) in enumerate(
+            zip(documents.contents, documents.file_names, documents.doc_types), 1
+        ):
+            summary_parts.append(f"### Document {i}: {file_name}\n")
+            summary_parts.append(f"**Type:** {doc_type}\n\n")
             
             # Extract key information
             if summary_type == "executive":
                 # Very brief summary
-                summary += f"{content[:200]}...\n\n"
+                summary_parts.append(f"{content[:200]}...\n\n")
             elif summary_type == "detailed":
                 # More detailed summary
-                summary += f"{content[:1000]}...\n\n"
+                summary_parts.append(f"{content[:1000]}...\n\n")
             else:
                 # General summary
-                summary += f"{content[:500]}...\n\n"
+                summary_parts.append(f"{content[:500]}...\n\n")
         
         # Overall summary
-        summary += "\n## Overall Summary\n\n"
-        summary += f"Analyzed {len(documents)} document(s) covering various aspects of the case. "
-        summary += "Key themes and information have been extracted and organized above.\n"
+        summary_parts.append("\n## Overall Summary\n\n")
+        summary_parts.append(f"Analyzed {len(documents)} document(s) covering various aspects of the case. ")
+        summary_parts.append("Key themes and information have been extracted and organized above.\n")
         
-        return summary
+        return "".join(summary_parts)
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _dates_in_context(context: str) -> tuple:
+        """Extract up to 20 unique dates from context (memoized per context string)"""
+        seen = set()
+        dates = []
+        for match in _DATE_RE.finditer(context):
+            date = match.group()
+            if date not in seen:
+                seen.add(date)
+                dates.append(date)
+                if len(dates) >= 20:
+                    break
+        
+        return tuple(dates)
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _parties_in_context(context: str) -> tuple:
+        """Extract up to 15 unique parties/people from context (memoized per context string)"""
+        # Simple pattern matching
+        seen = set()
+        parties = []
+        for pattern in _PARTY_RES:
+            for match in pattern.finditer(context):
+                for party in match.groups():
+                    if party and party not in seen:
+                        seen.add(party)
+                        parties.append(party)
+                        if len(parties) >= 15:
+                            return tuple(parties)
+        
+        return tuple(parties)
     
     def _extract_dates_from_context(self, context: str) -> List[str]:
         """Extract dates from context"""
-        date_patterns = [
-            r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
-            r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',
-            r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-        ]
-        
-        dates = []
-        for pattern in date_patterns:
-            dates.extend(re.findall(pattern, context))
-        
-        return list(set(dates))[:20]
+        return list(self._dates_in_context(context))
     
     def _extract_parties_from_context(self, context: str) -> List[str]:
         """Extract parties/people from context"""
-        # Simple pattern matching
-        patterns = [
-            r'(?:Plaintiff|Defendant|Appellant|Appellee|Petitioner|Respondent)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s+v\.',
-            r'(?:Mr\.|Ms\.|Mrs\.|Dr\.)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)',
-        ]
-        
-        parties = []
-        for pattern in patterns:
-            matches = re.findall(pattern, context)
-            if matches:
-                if isinstance(matches[0], tuple):
-                    parties.extend([m for match in matches for m in match if m])
-                else:
-                    parties.extend(matches)
-        
-        return list(set(parties))[:15]
+        return list(self._parties_in_context(context))
     
     def _summarize_context(self, context: str, question: str) -> str:
         """Generate a summary of the context relevant to the question"""
         # Simplified summarization
         # In production, use an LLM for better summarization
         
-        sentences = re.split(r'[.!?]+', context)
+        sentences = _SENT_SPLIT_RE.split(context)
         relevant_sentences = []
         
-        question_terms = question.lower().split()
-        
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            # Count how many question terms appear in sentence
-            matches = sum(1 for term in question_terms if term in sentence_lower)
-            if matches > 0 and len(sentence.strip()) > 20:
-                relevant_sentences.append(sentence.strip())
+        # Question words without surrounding punctuation ("John?" -> "john"); a term that still
+        # holds a sentence delimiter could never match within one sentence
+        question_terms = {term.strip(_TERM_PUNCTUATION) for term in question.lower().split()}
+        question_terms = sorted(
+            (term for term in question_terms if term and not _SENT_SPLIT_RE.search(term)),
+            key=len, reverse=True
+        )
+        
+        if question_terms:
+            # One case-insensitive sweep over the context for every question term,
+            # marking the sentence each match falls in
+            term_re = re.compile("|".join(map(re.escape, question_terms)), re.IGNORECASE)
+            boundaries = np.fromiter(
+                (m.start() for m in _SENT_SPLIT_RE.finditer(context)), dtype=np.int64
+            )
+            positions = np.fromiter((m.start() for m in term_re.finditer(context)), dtype=np.int64)
+            matched = np.bincount(
+                np.searchsorted(boundaries, positions, side='right'), minlength=len(sentences)
+            )
+            
+            # The first matching sentences, in document order
+            for index in np.flatnonzero(matched):
+                sentence = sentences[index].strip()
+                if len(sentence) > 20:
+                    relevant_sentences.append(sentence)
+                    if len(relevant_sentences) == 5:
+                        break
         
         if relevant_sentences:
             return " ".join(relevant_sentences[:5])
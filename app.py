@@ -0,0 +1,1298 @@
+"""
+Private AI Litigation Knowledge System
+A comprehensive, secure AI assistant for organizing, analyzing, and supporting 
+factual development for multiple overlapping legal cases.
+"""
+
+import gradio as gr
+import functools
+import hashlib
+import io
+import os
+import re
+import threading
+import uuid
+import json
+import shutil
+import sqlite3
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Import configuration module for environment variables and secrets
+try:
+    from config import Config
+    print("✓ Configuration module loaded")
+except ImportError as e:
+    print(f"⚠ Warning: Could not import config module: {e}")
+    print("  Authentication and environment variables will not be available")
+    Config = None
+
+# Import our custom modules
+try:
+    from document_processor import DocumentProcessor, submit_document_file
+    from knowledge_base import KnowledgeBase
+    from ai_analyzer import AIAnalyzer, SemanticCache
+    
+    # Use knowledge base directory from config if available
+    # (core components are created on first use, see _components)
+    kb_dir = Config.KNOWLEDGE_BASE_DIR if Config else "./knowledge_base"
+    
+    # Initialize Google Drive integration if enabled
+    google_drive = None
+    if Config and Config.GOOGLE_DRIVE_ENABLED:
+        try:
+            from google_drive_integration import (
+                DEFAULT_DOWNLOAD_WORKERS, SUPPORTED_MIME_TYPES, GoogleDriveIntegration
+            )
+            credentials_file = Config.GOOGLE_DRIVE_CREDENTIALS_FILE
+            token_file = Config.GOOGLE_DRIVE_TOKEN_FILE
+            if credentials_file:
+                google_drive = GoogleDriveIntegration(
+                    credentials_file=credentials_file,
+                    token_file=token_file
+                )
+                print("✓ Google Drive integration initialized")
+            else:
+                print("⚠ Google Drive enabled but GOOGLE_DRIVE_CREDENTIALS_FILE not set")
+        except ImportError as e:
+            print(f"⚠ Google Drive libraries not available: {e}")
+        except Exception as e:
+            print(f"⚠ Error initializing Google Drive: {e}")
+    
+    # Create documents storage directory for permanent file storage
+    # Use directory from config if available
+    if Config:
+        DOCUMENTS_STORAGE_DIR = Path(Config.DOCUMENTS_STORAGE_DIR)
+    else:
+        DOCUMENTS_STORAGE_DIR = Path("./uploaded_documents")
+    DOCUMENTS_STORAGE_DIR.mkdir(exist_ok=True)
+    # Absolute paths resolved once, for the stored file paths and the UI text
+    DOCUMENTS_STORAGE_DIR = DOCUMENTS_STORAGE_DIR.absolute()
+    kb_dir_absolute = Path(kb_dir).absolute()
+    print("✓ All modules loaded successfully")
+    print(f"✓ Documents will be saved to: {DOCUMENTS_STORAGE_DIR}")
+except ImportError as e:
+    print(f"✗ Import error: {e}")
+    print("Make sure document_processor.py, knowledge_base.py, and ai_analyzer.py are in the same directory")
+    raise
+except Exception as e:
+    print(f"✗ Error initializing modules: {e}")
+    raise
+
+# Characters removed from stored file names (anything but letters, digits, "._- ")
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w.\- ]+')
+
+# Separator of the pasted document IDs, surrounding whitespace included
+_ID_SEPARATOR_RE = re.compile(r'\s*,\s*')
+
+_components_lock = threading.Lock()
+
+# Guards the ingested-file registry connection, which the upload copy threads share
+_ingested_lock = threading.Lock()
+
+
+@functools.cache
+def _create_components() -> Tuple[DocumentProcessor, KnowledgeBase, AIAnalyzer]:
+    """Build the core components (cached, so this runs once)"""
+    doc_processor = DocumentProcessor(cache_dir=Config.PROCESSED_CACHE_DIR if Config else None)
+    knowledge_base = KnowledgeBase(storage_dir=kb_dir)
+    # Near-duplicate questions (cosine >= 0.97) reuse the previous answer
+    ai_analyzer = AIAnalyzer(enable_cache=True, cache_threshold=0.97,
+                             expand_queries=Config.QUERY_EXPANSION if Config else False)
+    # Documents stored in earlier sessions stay listed after a restart (most recent last)
+    upload_registry.add_many([
+        (doc_id, [doc['metadata'].get('file_name', 'Unknown'),
+                  doc['metadata'].get('doc_type', 'unknown'), 'Processed'])
+        for doc_id, doc in list(knowledge_base.documents.items())[-MAX_UPLOADED_DOCUMENTS:]
+    ])
+    print("✓ Knowledge base and analyzers initialized")
+    return doc_processor, knowledge_base, ai_analyzer
+
+
+def _components() -> Tuple[DocumentProcessor, KnowledgeBase, AIAnalyzer]:
+    """Document processor, knowledge base and analyzer, created once on first use
+    
+    Loading the embedding model and index takes seconds, so it happens here (or in the
+    background at startup) instead of at import time.
+    """
+    with _components_lock:
+        return _create_components()
+
+
+# Uploaded documents kept for the document list (oldest dropped beyond this many)
+MAX_UPLOADED_DOCUMENTS = 10_000
+
+
+class _UploadRegistry:
+    """Thread-safe, size-capped list of uploaded documents for the document table
+    
+    Only the table rows are kept; document text and metadata are persisted by the knowledge
+    base, which also seeds the list at startup.
+    """
+    
+    def __init__(self, max_entries: int = MAX_UPLOADED_DOCUMENTS):
+        self._lock = threading.RLock()
+        self._rows = OrderedDict()  # doc_id -> (name, type, status)
+        self._max_entries = max_entries
+        self._table = None  # Rows for the document list, rebuilt after changes
+    
+    def add_many(self, items: List[Tuple[str, List[str]]]):
+        """Record (doc_id, row) items in one atomic step"""
+        with self._lock:
+            for doc_id, row in items:
+                self._rows[doc_id] = tuple(row)
+                self._rows.move_to_end(doc_id)
+            while len(self._rows) > self._max_entries:
+                self._rows.popitem(last=False)
+            self._table = None
+    
+    def snapshot_table(self) -> List[List[str]]:
+        """Rows for the document list, oldest first (shared between callers until the next change)"""
+        with self._lock:
+            if self._table is None:
+                self._table = [list(row) for row in self._rows.values()]
+            return self._table
+
+
+def _warm_up():
+    """Load the components, and reconnect to Google Drive with a saved token, before the first request"""
+    _, knowledge_base, _ = _components()
+    if Config is None or Config.WARMUP_ON_START:
+        knowledge_base.warmup()
+        print("✓ Embedding model and search indexes warmed up")
+    if google_drive and not google_drive.service:
+        # Never opens the browser login here; that waits for the first Drive action
+        google_drive.authenticate(interactive=False)
+
+
+class _SingleFlight:
+    """Runs concurrent calls that share a key once, handing every caller the same result"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the call in progress
+    
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def _run_analysis(key: Tuple, fn: Callable[[], Any]) -> Any:
+    """Return the cached result for key, (name, *inputs, knowledge base version), else run fn once"""
+    # The exact key is the cache scope, so inputs keep their case
+    name = key[0]
+    cached = analysis_cache.get_exact(name, key)
+    if cached is not None:
+        return cached
+    result = analysis_flights.run(key, fn)
+    analysis_cache.put(None, result, key, text=name)
+    return result
+
+
+# Global state
+upload_registry = _UploadRegistry()
+
+# Identical analyses requested while one is running (e.g. by several users) wait for it
+analysis_flights = _SingleFlight()
+
+# Finished analyses, so repeating one against an unchanged knowledge base is a lookup
+analysis_cache = SemanticCache(max_entries=256)
+
+# Formatted search responses for repeated (or, for semantic/hybrid, near-identical) queries
+query_cache = SemanticCache(threshold=0.97, max_entries=1024)
+
+# Concurrent requests per handler: LLM-bound handlers share the model, search only embeds a query
+ANALYSIS_CONCURRENCY_LIMIT = 2
+SEARCH_CONCURRENCY_LIMIT = 8
+# Requests allowed to wait in the queue before new ones are rejected
+QUEUE_MAX_SIZE = 64
+
+
+def _storage_path(file_name: str) -> Path:
+    """Path in permanent storage for a file: safe characters only, plus a timestamp and unique suffix"""
+    # Create a safe filename (remove invalid characters)
+    safe_filename = _UNSAFE_FILENAME_RE.sub('', file_name)
+    # Add timestamp for readability, and a random suffix so files with the same name
+    # stored within the same second (e.g. by concurrent uploads) never overwrite each other
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem, ext = os.path.splitext(safe_filename)
+    return DOCUMENTS_STORAGE_DIR / f"{stem}_{timestamp}_{uuid.uuid4().hex[:8]}{ext}"
+
+
+def _save_to_storage(file_path: str) -> str:
+    """Copy an uploaded file into permanent storage under a safe, timestamped name"""
+    permanent_path = _storage_path(os.path.basename(file_path))
+    try:
+        # Same filesystem: a hard link stores the file without copying a byte, and leaves the
+        # upload in place for Gradio (a rename would take it away)
+        os.link(file_path, permanent_path)
+    except OSError:
+        # Other filesystem (or no hard links): copy2 copies in the kernel (sendfile /
+        # copy_file_range) where the OS supports it
+        shutil.copy2(file_path, permanent_path)
+    return str(permanent_path)
+
+
+@functools.cache
+def _ingested_db() -> sqlite3.Connection:
+    """SHA-256 of every uploaded file already in the knowledge base (opened once)"""
+    conn = sqlite3.connect(str(DOCUMENTS_STORAGE_DIR / 'ingested.sqlite'), check_same_thread=False)
+    conn.execute("CREATE TABLE IF NOT EXISTS ingested (sha TEXT PRIMARY KEY, doc_id TEXT, first_seen TEXT)")
+    conn.commit()
+    return conn
+
+
+def _file_sha256(file_path: str) -> str:
+    """SHA-256 of a file's bytes (hashlib.file_digest reads it in C, without holding the GIL)"""
+    with open(file_path, 'rb') as file:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(file, 'sha256').hexdigest()
+        hasher = hashlib.sha256()
+        for block in iter(lambda: file.read(1 << 20), b''):
+            hasher.update(block)
+        return hasher.hexdigest()
+
+
+def _ingested_doc_id(sha: str) -> Optional[str]:
+    """Document ID of a previously ingested file with this hash, if any"""
+    try:
+        with _ingested_lock:
+            row = _ingested_db().execute("SELECT doc_id FROM ingested WHERE sha = ?", (sha,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"⚠ Could not read ingested file registry: {e}")
+        return None
+    return row[0] if row else None
+
+
+def _record_ingested(items: List[Tuple[str, str]]):
+    """Remember (sha, doc_id) pairs of newly ingested files"""
+    first_seen = datetime.now().isoformat()
+    try:
+        with _ingested_lock:
+            conn = _ingested_db()
+            conn.executemany("INSERT OR REPLACE INTO ingested VALUES (?, ?, ?)",
+                             [(sha, doc_id, first_seen) for sha, doc_id in items])
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"⚠ Could not update ingested file registry: {e}")
+
+
+def _stage_upload(file_path: str, documents: Dict[str, Any]) -> Tuple[str, Optional[str], Optional[str]]:
+    """Hash an upload and, unless it is already in the knowledge base, copy it to storage
+    
+    Returns (sha, doc_id of the existing copy or None, permanent path or None for duplicates).
+    """
+    sha = _file_sha256(file_path)
+    duplicate_of = _ingested_doc_id(sha)
+    if duplicate_of is not None and duplicate_of in documents:
+        return sha, duplicate_of, None
+    return sha, None, _save_to_storage(file_path)
+
+
+def process_uploaded_files(files):
+    """Process uploaded files and extract content"""
+    _, knowledge_base, _ = _components()
+    if files is None:
+        return "No files uploaded", []
+    
+    status_buf = io.StringIO()
+    file_paths = [file.name if hasattr(file, 'name') else file for file in files]
+    
+    # Copy on threads (I/O) and parse in worker processes (CPU); results are used in upload order
+    cache_dir = Config.PROCESSED_CACHE_DIR if Config else None
+    workers = max(1, min(len(file_paths), os.cpu_count() or 1))
+    # CPUs left over by small batches split the pages of large PDFs instead
+    pdf_workers = max(1, (os.cpu_count() or 1) // max(1, len(file_paths)))
+    jobs = [None] * len(file_paths)
+    with ThreadPoolExecutor(max_workers=workers) as copier:
+        # Files already ingested (same bytes) are skipped before they are copied, parsed or embedded
+        copy_futures = {
+            copier.submit(_stage_upload, file_path, knowledge_base.documents): index
+            for index, file_path in enumerate(file_paths)
+        }
+        # Start parsing each file as soon as its own copy finishes, not after the ones before it
+        for copy_future in as_completed(copy_futures):
+            index = copy_futures[copy_future]
+            file_path = file_paths[index]
+            try:
+                (sha, duplicate_of, permanent_file_path), copy_error = copy_future.result(), None
+            except Exception as e:
+                # Fallback to original path
+                sha, duplicate_of, permanent_file_path, copy_error = None, None, file_path, e
+            if duplicate_of is not None:
+                jobs[index] = (file_path, sha, duplicate_of, None, None, None)
+                continue
+            # Process document (use permanent path if available)
+            jobs[index] = (file_path, sha, None, permanent_file_path, copy_error,
+                           submit_document_file(permanent_file_path, cache_dir, pdf_workers))
+        
+        # Collect results in upload order; the knowledge base is only touched from this thread
+        pending = []
+        for file_path, sha, duplicate_of, permanent_file_path, copy_error, process_future in jobs:
+            file_name = os.path.basename(file_path)
+            if duplicate_of is not None:
+                status_buf.write(f"↺ {file_name} - Duplicate of {duplicate_of}, skipped\n")
+                continue
+            if copy_error is not None:
+                status_buf.write(f"⚠ {file_name} - Could not save to permanent storage: {str(copy_error)}\n")
+            try:
+                result = process_future.result()
+                
+                if result['success']:
+                    # Queue for the knowledge base (stored below in one batched insert)
+                    pending.append((file_name, sha, result, {
+                        'file_name': file_name,
+                        'file_path': permanent_file_path,
+                        'original_path': file_path,
+                        'doc_type': result['doc_type'],
+                        'upload_date': datetime.now().isoformat(),
+                        'parties': result.get('parties', []),
+                        'dates': result.get('dates', []),
+                        'topics': result.get('topics', [])
+                    }))
+                    status_buf.write(f"✓ {file_name} - {result['doc_type']} processed successfully\n")
+                    if permanent_file_path != file_path:
+                        status_buf.write(f"  📁 Saved to: {permanent_file_path}\n")
+                else:
+                    status_buf.write(f"✗ {file_name} - Error: {result.get('error', 'Unknown error')}\n")
+                    
+            except Exception as e:
+                status_buf.write(f"✗ {file_name} - Exception: {str(e)}\n")
+    
+    # Store in knowledge base: one embedding pass and one index update for the whole upload
+    if pending:
+        try:
+            doc_ids = knowledge_base.add_documents(
+                [(result['content'], metadata) for _, _, result, metadata in pending]
+            )
+            upload_registry.add_many([
+                (doc_id, [file_name, result['doc_type'], 'Processed'])
+                for doc_id, (file_name, _, result, _) in zip(doc_ids, pending)
+            ])
+            _record_ingested([(sha, doc_id) for doc_id, (_, sha, _, _) in zip(doc_ids, pending) if sha])
+        except Exception as e:
+            status_buf.write(f"✗ Could not add {len(pending)} document(s) to the knowledge base: {str(e)}\n")
+    
+    status_text = status_buf.getvalue()
+    doc_list = upload_registry.snapshot_table()
+    
+    return status_text, doc_list
+
+
+def _split_folder_ids(folder_ids: Optional[str]) -> List[str]:
+    """Folder IDs from a comma-separated field (empty = all accessible files)"""
+    return [folder_id.strip() for folder_id in (folder_ids or '').split(',') if folder_id.strip()]
+
+
+def _download_drive_file(file_info: Dict[str, Any], temp_dir: Path) -> Optional[str]:
+    """Download one Drive file (exporting Google Docs/Sheets/Slides) into temp_dir"""
+    file_id = file_info['id']
+    file_name = file_info['name']
+    mime_type = file_info.get('mimeType', '')
+    
+    # Determine if it's a Google Workspace file that needs export
+    is_google_doc = mime_type.startswith('application/vnd.google-apps.')
+    
+    # Temp names are prefixed with the file ID: files downloading together may share a name
+    if is_google_doc:
+        # Export Google Docs/Sheets/Slides
+        export_mime = 'application/pdf'  # Default export format
+        file_ext = '.pdf'
+        if 'document' in mime_type:
+            export_mime = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            file_ext = '.docx'
+        elif 'spreadsheet' in mime_type:
+            export_mime = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            file_ext = '.xlsx'
+        elif 'presentation' in mime_type:
+            # Slides export their text directly; a PDF would only be parsed back into text
+            export_mime = 'text/plain'
+            file_ext = '.txt'
+        
+        # Remove existing extension if present and add correct one
+        base_name = file_name.rsplit('.', 1)[0] if '.' in file_name else file_name
+        dest_path = temp_dir / f"{file_id}_{base_name}{file_ext}"
+        return google_drive.export_google_doc(file_id, export_mime, str(dest_path))
+    
+    # Regular file download
+    dest_path = temp_dir / f"{file_id}_{file_name}"
+    return google_drive.download_file(file_id, str(dest_path), file_metadata=file_info)
+
+
+def list_uploaded_documents():
+    """Rows for the uploaded documents table"""
+    _components()  # Seeds the list from the knowledge base on first use
+    return upload_registry.snapshot_table()
+
+
+def _fetch_drive_file(file_info: Dict[str, Any], temp_dir: Path,
+                      documents: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Download a Drive file and hash it, dropping it again if the same bytes were already ingested
+    
+    Returns (downloaded path or None, sha, doc_id of the existing copy or None).
+    """
+    downloaded_path = _download_drive_file(file_info, temp_dir)
+    if not downloaded_path:
+        return None, None, None
+    sha = _file_sha256(downloaded_path)
+    duplicate_of = _ingested_doc_id(sha)
+    if duplicate_of is not None and duplicate_of in documents:
+        os.remove(downloaded_path)
+        return None, sha, duplicate_of
+    return downloaded_path, sha, None
+
+
+def import_from_google_drive(folder_id: Optional[str] = None, file_types: Optional[List[str]] = None):
+    """Import documents from Google Drive"""
+    _, knowledge_base, _ = _components()
+    if not google_drive:
+        return "Google Drive integration is not enabled or configured. Check your .env file.", []
+    
+    try:
+        # Authenticate if needed
+        if not google_drive.service:
+            auth_result = google_drive.authenticate()
+            if not auth_result:
+                return "Failed to authenticate with Google Drive. Please check your credentials.", []
+        
+        # Use folder ID from config if not provided
+        if not folder_id and Config and Config.GOOGLE_DRIVE_FOLDER_ID:
+            folder_id = Config.GOOGLE_DRIVE_FOLDER_ID
+        
+        # Get supported MIME types
+        supported_mimes = file_types if file_types else SUPPORTED_MIME_TYPES
+        
+        # List files
+        status_messages = []
+        status_messages.append("📥 Fetching files from Google Drive...")
+        
+        files = google_drive.list_files(parent_folder_ids=_split_folder_ids(folder_id), mime_types=supported_mimes)
+        
+        if not files:
+            return "No supported files found in Google Drive.", []
+        
+        status_messages.append(f"✓ Found {len(files)} file(s) in Google Drive")
+        
+        # Download on threads (I/O) and parse in worker processes (CPU), as for local uploads
+        temp_dir = DOCUMENTS_STORAGE_DIR / "google_drive_temp"
+        temp_dir.mkdir(exist_ok=True)
+        cache_dir = Config.PROCESSED_CACHE_DIR if Config else None
+        # Downloads are network-bound, so their pool is not limited by the CPU count
+        download_workers = min(DEFAULT_DOWNLOAD_WORKERS, len(files))
+        pdf_workers = max(1, (os.cpu_count() or 1) // len(files))
+        jobs = [None] * len(files)
+        pending = []
+        with ThreadPoolExecutor(max_workers=download_workers) as downloader:
+            # Files already ingested (same bytes) are not parsed or embedded again
+            download_futures = {
+                downloader.submit(_fetch_drive_file, file_info, temp_dir, knowledge_base.documents): index
+                for index, file_info in enumerate(files)
+            }
+            for download_future in as_completed(download_futures):
+                index = download_futures[download_future]
+                try:
+                    (downloaded_path, sha, duplicate_of), download_error = download_future.result(), None
+                except Exception as e:
+                    downloaded_path, sha, duplicate_of, download_error = None, None, None, e
+                process_future = None
+                if downloaded_path:
+                    process_future = submit_document_file(downloaded_path, cache_dir, pdf_workers)
+                jobs[index] = (downloaded_path, sha, duplicate_of, download_error, process_future)
+            
+            # Collect results in listing order; the knowledge base is only touched from this thread
+            for file_info, (downloaded_path, sha, duplicate_of, download_error, process_future) in zip(files, jobs):
+                file_name = file_info['name']
+                if download_error is not None:
+                    status_messages.append(f"✗ {file_name} - Exception: {str(download_error)}")
+                    continue
+                if duplicate_of is not None:
+                    status_messages.append(f"↺ {file_name} - Duplicate of {duplicate_of}, skipped")
+                    continue
+                if process_future is None:
+                    status_messages.append(f"✗ {file_name} - Failed to download")
+                    continue
+                try:
+                    result = process_future.result()
+                    
+                    if result['success']:
+                        # Move to permanent storage
+                        permanent_path = _storage_path(file_name)
+                        shutil.move(downloaded_path, permanent_path)
+                        
+                        # Queue for the knowledge base (stored below in one batched insert)
+                        pending.append((file_name, sha, result, {
+                            'file_name': file_name,
+                            'file_path': str(permanent_path),
+                            'source': 'google_drive',
+                            'google_drive_id': file_info['id'],
+                            'doc_type': result['doc_type'],
+                            'upload_date': datetime.now().isoformat(),
+                            'parties': result.get('parties', []),
+                            'dates': result.get('dates', []),
+                            'topics': result.get('topics', [])
+                        }))
+                        status_messages.append(f"✓ {file_name} - Processed successfully")
+                    else:
+                        status_messages.append(f"✗ {file_name} - Error: {result.get('error', 'Unknown error')}")
+                        
+                except Exception as e:
+                    status_messages.append(f"✗ {file_name} - Exception: {str(e)}")
+        
+        # Store in knowledge base: one embedding pass and one index update for the whole import
+        processed_files = []
+        if pending:
+            try:
+                doc_ids = knowledge_base.add_documents(
+                    [(result['content'], metadata) for _, _, result, metadata in pending]
+                )
+                rows = [[file_name, result['doc_type'], 'Processed'] for file_name, _, result, _ in pending]
+                upload_registry.add_many(list(zip(doc_ids, rows)))
+                _record_ingested([(sha, doc_id) for doc_id, (_, sha, _, _) in zip(doc_ids, pending) if sha])
+                processed_files = [list(row) for row in rows]
+            except Exception as e:
+                status_messages.append(f"✗ Could not add {len(pending)} document(s) to the knowledge base: {str(e)}")
+        
+        status_text = "\n".join(status_messages)
+        return status_text, processed_files
+        
+    except Exception as e:
+        return f"Error importing from Google Drive: {str(e)}", []
+
+
+def list_google_drive_files(folder_id: Optional[str] = None):
+    """List files available in Google Drive"""
+    if not google_drive:
+        return "Google Drive integration is not enabled or configured.", []
+    
+    try:
+        # Authenticate if needed
+        if not google_drive.service:
+            auth_result = google_drive.authenticate()
+            if not auth_result:
+                return "Failed to authenticate with Google Drive.", []
+        
+        # Use folder ID from config if not provided
+        if not folder_id and Config and Config.GOOGLE_DRIVE_FOLDER_ID:
+            folder_id = Config.GOOGLE_DRIVE_FOLDER_ID
+        
+        files = google_drive.list_files(parent_folder_ids=_split_folder_ids(folder_id),
+                                        mime_types=SUPPORTED_MIME_TYPES)
+        
+        if not files:
+            return "No supported files found in Google Drive.", []
+        
+        file_list = []
+        for file_info in files:
+            file_list.append([
+                file_info.get('name', 'Unknown'),
+                file_info.get('mimeType', 'Unknown'),
+                file_info.get('size', 'N/A'),
+                file_info.get('modifiedTime', 'N/A')[:10] if file_info.get('modifiedTime') else 'N/A'
+            ])
+        
+        return f"Found {len(files)} file(s) in Google Drive:", file_list
+        
+    except Exception as e:
+        return f"Error listing Google Drive files: {str(e)}", []
+
+
+# Characters of each search result's content shown in the results
+SNIPPET_CHARS = 500
+_RESULT_SEPARATOR = '─' * 50
+
+
+def _format_search_results(results: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """Markdown for search results, and the list of their source documents"""
+    formatted_results = []
+    sources = []
+    
+    for i, result in enumerate(results, 1):
+        doc_info = result.get('metadata') or {}
+        file_name = doc_info.get('file_name', 'Unknown')
+        content = result.get('content') or ''
+        # Slice first, so at most SNIPPET_CHARS characters are copied into the response
+        snippet = content[:SNIPPET_CHARS] + ('...' if len(content) > SNIPPET_CHARS else '')
+        
+        formatted_results.append(
+            f"**Result {i}** (Relevance: {result.get('score', 0):.3f})\n"
+            f"Document: {file_name}\n"
+            f"Type: {doc_info.get('doc_type', 'Unknown')}\n"
+            f"Content: {snippet}\n"
+            f"{_RESULT_SEPARATOR}\n"
+        )
+        sources.append(file_name)
+    
+    # Unique sources in ranking order
+    return "\n".join(formatted_results), "\n".join(f"• {s}" for s in dict.fromkeys(sources))
+
+
+def query_knowledge_base(query: str, search_type: str = "semantic"):
+    """Query the knowledge base with different search types"""
+    _, knowledge_base, _ = _components()
+    if not query or not query.strip():
+        return "Please enter a query.", ""
+    
+    try:
+        # Entries are only valid for this search type and knowledge base state
+        cache_scope = (search_type, knowledge_base.version)
+        cached = query_cache.get_exact(query, cache_scope)
+        if cached is not None:
+            return cached
+        query_embedding = None
+        if search_type != "keyword":
+            # Keyword results depend on the exact terms, so only exact repeats are reused for them
+            query_embedding = knowledge_base.embed(query)
+            cached = query_cache.get(query_embedding, cache_scope)
+            if cached is not None:
+                return cached
+        
+        if search_type == "semantic":
+            results = knowledge_base.semantic_search(query, top_k=5)
+        elif search_type == "keyword":
+            results = knowledge_base.keyword_search(query, top_k=5)
+        else:
+            results = knowledge_base.hybrid_search(query, top_k=5)
+        
+        if not results:
+            return "No results found.", ""
+        
+        response_text, sources_text = _format_search_results(results)
+        query_cache.put(query_embedding, (response_text, sources_text), cache_scope, text=query)
+        return response_text, sources_text
+        
+    except Exception as e:
+        return f"Error querying knowledge base: {str(e)}", ""
+
+
+def ask_question(message: str, history: List):
+    """Chat interface for asking questions about the legal documents"""
+    _, knowledge_base, ai_analyzer = _components()
+    if not message or not message.strip():
+        return ""
+    
+    try:
+        # Only the most recent turns go along with the question, however long the session gets
+        max_turns = Config.CHAT_HISTORY_TURNS if Config else 8
+        recent_history = history[-max_turns:] if history and max_turns > 0 else []
+        
+        # Use AI analyzer to generate comprehensive response
+        response = ai_analyzer.answer_question(
+            question=message,
+            knowledge_base=knowledge_base,
+            chat_history=recent_history
+        )
+        
+        return response
+        
+    except Exception as e:
+        return f"Error generating response: {str(e)}"
+
+
+# Formats produced by the document processor's date extraction
+_EVENT_DATE_FORMATS = (
+    '%m/%d/%Y', '%m-%d-%Y', '%m/%d/%y', '%m-%d-%y',
+    '%Y-%m-%d', '%Y/%m/%d',
+    '%B %d, %Y', '%B %d %Y', '%d %B %Y',
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_event_date(date_str: str) -> np.datetime64:
+    """Parse an extracted date string to a day (NaT if it is not a recognised date)"""
+    normalized = ' '.join(str(date_str).split())
+    for fmt in _EVENT_DATE_FORMATS:
+        try:
+            return np.datetime64(datetime.strptime(normalized, fmt).date(), 'D')
+        except ValueError:
+            continue
+    return np.datetime64('NaT', 'D')
+
+
+def build_timeline(query: str, date_range: Optional[Tuple[str, str]] = None):
+    """Build a chronological timeline of events"""
+    _, knowledge_base, _ = _components()
+    if not query or not query.strip():
+        return "Please enter a query to build timeline.", pd.DataFrame()
+    
+    try:
+        # Search for relevant documents
+        results = knowledge_base.semantic_search(query, top_k=20)
+        
+        # Extract events with dates
+        dates = []
+        rows = []
+        append_date = dates.append
+        append_row = rows.append
+        for result in results:
+            metadata = result.get('metadata') or {}
+            event_dates = metadata.get('dates') or ()
+            if not event_dates:
+                continue
+            content = result.get('content') or ''
+            # Shared by every event from this document
+            row = (
+                content[:200] + "..." if len(content) > 200 else content,
+                metadata.get('file_name', 'Unknown'),
+                metadata.get('doc_type', 'Unknown'),
+                ', '.join(metadata.get('parties') or ())
+            )
+            for date_str in event_dates:
+                append_date(_parse_event_date(date_str))
+                append_row(row)
+        
+        if not rows:
+            return "No timeline events found for this query.", pd.DataFrame()
+        
+        # Sort by date (unparseable dates last) and build the DataFrame once from sorted columns
+        dates64 = np.array(dates, dtype='datetime64[D]')
+        order = np.argsort(dates64, kind='stable')
+        sorted_dates = dates64[order]
+        # Formatted once, in one vectorized pass; unparseable dates are shown empty
+        date_strings = np.datetime_as_string(sorted_dates, unit='D').astype(object)
+        date_strings[np.isnat(sorted_dates)] = None
+        events, documents, types, parties = zip(*(rows[i] for i in order))
+        # Document/Type/Parties repeat for every event of a document, so store them as categoricals
+        df = pd.DataFrame({
+            'Date': date_strings,
+            'Event': events,
+            'Document': pd.Categorical(documents),
+            'Type': pd.Categorical(types),
+            'Parties': pd.Categorical(parties)
+        })
+        
+        return f"Timeline built with {len(rows)} events.", df
+        
+    except Exception as e:
+        return f"Error building timeline: {str(e)}", pd.DataFrame()
+
+
+def detect_rico_patterns(query: str):
+    """Detect potential RICO-related patterns"""
+    _, knowledge_base, ai_analyzer = _components()
+    if not query or not query.strip():
+        return "Please enter a query to analyze for RICO patterns.", ""
+    
+    try:
+        def run():
+            # Search for relevant documents
+            results = knowledge_base.semantic_search(query, top_k=15)
+            
+            # Use AI analyzer to detect RICO patterns
+            return ai_analyzer.detect_rico_patterns(
+                query=query,
+                documents=results
+            )
+        
+        analysis = _run_analysis(('rico', query, knowledge_base.version), run)
+        
+        return analysis
+        
+    except Exception as e:
+        return f"Error detecting RICO patterns: {str(e)}", ""
+
+
+def generate_summary(doc_ids: List[str], summary_type: str = "general"):
+    """Generate summaries of selected documents"""
+    _, knowledge_base, ai_analyzer = _components()
+    if not doc_ids:
+        return "Please select documents to summarize.", ""
+    
+    try:
+        def run():
+            documents = []
+            for doc_id in doc_ids:
+                doc = knowledge_base.get_document(doc_id)
+                if doc:
+                    documents.append(doc)
+            
+            if not documents:
+                return "No documents found for selected IDs.", ""
+            
+            return ai_analyzer.generate_summary(
+                documents=documents,
+                summary_type=summary_type
+            )
+        
+        # Document order is kept in the key: the summary numbers documents in the order given
+        summary = _run_analysis(('summary', tuple(doc_ids), summary_type, knowledge_base.version), run)
+        
+        return summary
+        
+    except Exception as e:
+        return f"Error generating summary: {str(e)}", ""
+
+
+def summarize_document_ids(ids: str, summary_type: str = "general"):
+    """Generate summaries of the documents in a comma-separated ID field"""
+    ids = (ids or '').strip()
+    return generate_summary(_ID_SEPARATOR_RE.split(ids) if ids else [], summary_type)
+
+
+def find_contradictions(query: str):
+    """Find documents that contradict each other"""
+    _, knowledge_base, ai_analyzer = _components()
+    if not query or not query.strip():
+        return "Please enter a query to find contradictions.", ""
+    
+    try:
+        contradictions = _run_analysis(
+            ('contradictions', query, knowledge_base.version),
+            lambda: ai_analyzer.find_contradictions(
+                query=query,
+                documents=knowledge_base.semantic_search(query, top_k=10)
+            )
+        )
+        
+        return contradictions
+        
+    except Exception as e:
+        return f"Error finding contradictions: {str(e)}", ""
+
+
+def analyze_relationships(entities: str):
+    """Analyze relationships between entities"""
+    _, knowledge_base, ai_analyzer = _components()
+    if not entities or not entities.strip():
+        return "Please enter entities to analyze (comma-separated).", ""
+    
+    try:
+        # Each distinct, non-empty entity once
+        entity_list = list(dict.fromkeys(e.strip() for e in entities.split(',') if e.strip()))
+        if not entity_list:
+            return "Please enter entities to analyze (comma-separated).", ""
+        
+        def run():
+            # Search for documents mentioning these entities: one embedding pass and one index
+            # search for all of them, keeping each document once (with its best score)
+            best_results = {}
+            entity_hits = Counter()
+            for results in knowledge_base.semantic_search_batch(entity_list, top_k=5):
+                for result in results:
+                    doc_id = result['doc_id']
+                    entity_hits[doc_id] += 1
+                    kept = best_results.get(doc_id)
+                    if kept is None or result['score'] > kept['score']:
+                        best_results[doc_id] = result
+            # Documents found for several entities first: they are the likeliest to link them
+            all_results = sorted(best_results.values(),
+                                 key=lambda result: (-entity_hits[result['doc_id']], -result['score']))
+            
+            # Analyze relationships
+            return ai_analyzer.analyze_relationships(
+                entities=entity_list,
+                documents=all_results
+            )
+        
+        relationships = _run_analysis(('relationships', tuple(entity_list), knowledge_base.version), run)
+        
+        return relationships
+        
+    except Exception as e:
+        return f"Error analyzing relationships: {str(e)}", ""
+
+
+def create_interface() -> gr.Blocks:
+    """Build the Gradio interface
+    
+    Called from the __main__ block only: document worker processes re-run this file on import,
+    and must not build the UI again.
+    """
+    with gr.Blocks(title="Private AI Litigation Knowledge System") as demo:
+        gr.Markdown(f"""
+        # ⚖️ Private AI Litigation Knowledge System
+        
+        A comprehensive, secure AI assistant to organize, analyze, and support factual development 
+        for multiple overlapping legal cases (state, federal, bankruptcy, business/financial).
+        
+        **Features:**
+        - 📄 Document ingestion and processing (emails, PDFs, court filings, notes, evidence, financial records)
+        - 🧠 Intelligent knowledge base with semantic search
+        - 🔍 Advanced query and analysis capabilities
+        - 📅 Chronological timeline builder
+        - 🎯 RICO pattern detection
+        - 📊 Relationship analysis and contradiction detection
+        
+        **Storage Locations:**
+        - 📁 **Original Documents:** `{DOCUMENTS_STORAGE_DIR}`
+        - 🧠 **Knowledge Base:** `{kb_dir_absolute}`
+        """)
+        
+        with gr.Tabs() as main_tabs:
+            # Tab 1: Document Upload & Management
+            with gr.Tab("📁 Document Upload"):
+                gr.Markdown("### Upload and Process Legal Documents")
+                gr.Markdown("Upload emails, PDFs, court filings, notes, evidence, and financial records. "
+                           "Documents are automatically classified and organized.")
+                
+                with gr.Row():
+                    with gr.Column(scale=2):
+                        file_upload = gr.File(
+                            label="Upload Documents",
+                            file_count="multiple",
+                            file_types=[".pdf", ".txt", ".doc", ".docx", ".eml", ".msg", ".csv", ".xlsx"],
+                            height=200
+                        )
+                        upload_btn = gr.Button("Process Documents", variant="primary", size="lg")
+                    
+                    with gr.Column(scale=1):
+                        gr.Markdown("**Supported Formats:**")
+                        gr.Markdown("""
+                        - PDF documents
+                        - Text files (.txt)
+                        - Word documents (.doc, .docx)
+                        - Email files (.eml, .msg)
+                        - Spreadsheets (.csv, .xlsx)
+                        """)
+                
+                with gr.Row():
+                    upload_status = gr.Textbox(
+                        label="Processing Status",
+                        lines=10,
+                        interactive=False
+                    )
+                
+                with gr.Row():
+                    documents_table = gr.Dataframe(
+                        label="Uploaded Documents",
+                        headers=["File Name", "Type", "Status"],
+                        interactive=False,
+                        wrap=True
+                    )
+                
+                upload_btn.click(
+                    fn=process_uploaded_files,
+                    inputs=file_upload,
+                    outputs=[upload_status, documents_table]
+                )
+                file_upload.upload(
+                    fn=process_uploaded_files,
+                    inputs=file_upload,
+                    outputs=[upload_status, documents_table]
+                )
+                # Show documents from earlier sessions when the page opens
+                demo.load(
+                    fn=list_uploaded_documents,
+                    outputs=documents_table
+                )
+                
+                # Google Drive Integration Section
+                if google_drive:
+                    gr.Markdown("---")
+                    gr.Markdown("### 📥 Import from Google Drive")
+                    gr.Markdown("Import documents directly from your Google Drive. "
+                               "Files will be downloaded and processed automatically.")
+                    
+                    with gr.Row():
+                        with gr.Column():
+                            drive_folder_id = gr.Textbox(
+                                label="Google Drive Folder ID (Optional)",
+                                placeholder="Leave empty to import all accessible files, or enter folder IDs separated by commas",
+                                value=Config.GOOGLE_DRIVE_FOLDER_ID if Config else None
+                            )
+                            list_drive_btn = gr.Button("List Files in Google Drive", variant="secondary")
+                            import_drive_btn = gr.Button("Import from Google Drive", variant="primary")
+                    
+                    with gr.Row():
+                        drive_files_list = gr.Dataframe(
+                            label="Files Available in Google Drive",
+                            headers=["File Name", "Type", "Size", "Modified"],
+                            interactive=False,
+                            wrap=True
+                        )
+                    
+                    with gr.Row():
+                        drive_import_status = gr.Textbox(
+                            label="Google Drive Import Status",
+                            lines=10,
+                            interactive=False
+                        )
+                    
+                    list_drive_btn.click(
+                        fn=list_google_drive_files,
+                        inputs=drive_folder_id,
+                        outputs=[drive_import_status, drive_files_list]
+                    )
+                    
+                    import_drive_btn.click(
+                        fn=import_from_google_drive,
+                        inputs=drive_folder_id,
+                        outputs=[drive_import_status, documents_table]
+                    )
+            
+            # Tab 2: Knowledge Base Query
+            with gr.Tab("🔍 Search & Query"):
+                gr.Markdown("### Query Your Legal Knowledge Base")
+                gr.Markdown("Ask questions and search through all uploaded documents using semantic search.")
+                
+                with gr.Row():
+                    with gr.Column():
+                        query_input = gr.Textbox(
+                            label="Enter your query",
+                            placeholder="e.g., What events involve these three people?",
+                            lines=3
+                        )
+                        search_type = gr.Radio(
+                            choices=["semantic", "keyword", "hybrid"],
+                            value="semantic",
+                            label="Search Type"
+                        )
+                        search_btn = gr.Button("Search", variant="primary")
+                    
+                with gr.Row():
+                    with gr.Column():
+                        search_results = gr.Markdown(label="Search Results")
+                        sources_list = gr.Textbox(
+                            label="Source Documents",
+                            lines=5,
+                            interactive=False
+                        )
+                
+                search_btn.click(
+                    fn=query_knowledge_base,
+                    inputs=[query_input, search_type],
+                    outputs=[search_results, sources_list],
+                    concurrency_limit=SEARCH_CONCURRENCY_LIMIT,
+                    concurrency_id="search"
+                )
+                query_input.submit(
+                    fn=query_knowledge_base,
+                    inputs=[query_input, search_type],
+                    outputs=[search_results, sources_list],
+                    concurrency_limit=SEARCH_CONCURRENCY_LIMIT,
+                    concurrency_id="search"
+                )
+            
+            # Tab 3: AI Assistant Chat
+            with gr.Tab("💬 AI Assistant"):
+                gr.Markdown("### Interactive AI Assistant")
+                gr.Markdown("Ask complex questions about your legal documents. The AI will analyze "
+                           "all relevant materials and provide comprehensive answers.")
+                
+                gr.ChatInterface(
+                    fn=ask_question,
+                    title="Legal Document Assistant",
+                    description="Ask questions about your legal documents, cases, and evidence.",
+                    examples=[
+                        "What events involve these three people?",
+                        "Summarize filings related to this issue.",
+                        "Are there documents that contradict each other?",
+                        "Build a timeline of financial or transactional events.",
+                        "Show possible RICO-pattern connections around these dates."
+                    ],
+                    cache_examples=False,
+                    concurrency_limit=ANALYSIS_CONCURRENCY_LIMIT
+                )
+            
+            # Tab 4: Timeline Builder
+            with gr.Tab("📅 Timeline Builder"):
+                gr.Markdown("### Build Chronological Timelines")
+                gr.Markdown("Create chronological timelines of events from your documents.")
+                
+                with gr.Row():
+                    with gr.Column():
+                        timeline_query = gr.Textbox(
+                            label="Query for Timeline",
+                            placeholder="e.g., financial transactions, communications, court filings",
+                            lines=2
+                        )
+                        timeline_btn = gr.Button("Build Timeline", variant="primary")
+                    
+                with gr.Row():
+                    timeline_status = gr.Textbox(
+                        label="Status",
+                        interactive=False
+                    )
+                
+                with gr.Row():
+                    timeline_df = gr.Dataframe(
+                        label="Timeline Events",
+                        interactive=False,
+                        wrap=True
+                    )
+                
+                timeline_btn.click(
+                    fn=build_timeline,
+                    inputs=timeline_query,
+                    outputs=[timeline_status, timeline_df]
+                )
+                timeline_query.submit(
+                    fn=build_timeline,
+                    inputs=timeline_query,
+                    outputs=[timeline_status, timeline_df]
+                )
+            
+            # Tab 5: RICO Pattern Detection
+            with gr.Tab("🎯 RICO Analysis"):
+                gr.Markdown("### RICO Pattern Detection")
+                gr.Markdown("Identify potential RICO-related patterns including actors, timing, "
+                           "coordination, transactions, and communications.")
+                
+                with gr.Row():
+                    with gr.Column():
+                        rico_query = gr.Textbox(
+                            label="Query for RICO Analysis",
+                            placeholder="e.g., transactions between parties, coordinated actions",
+                            lines=3
+                        )
+                        rico_btn = gr.Button("Analyze for RICO Patterns", variant="primary")
+                    
+                with gr.Row():
+                    rico_analysis = gr.Markdown(label="RICO Pattern Analysis")
+                
+                # One event for both triggers: Enter followed by a click joins the analysis already running
+                gr.on(
+                    triggers=[rico_btn.click, rico_query.submit],
+                    fn=detect_rico_patterns,
+                    inputs=rico_query,
+                    outputs=rico_analysis,
+                    concurrency_limit=ANALYSIS_CONCURRENCY_LIMIT,
+                    concurrency_id="rico"
+                )
+            
+            # Tab 6: Analysis Tools
+            with gr.Tab("📊 Analysis Tools"):
+                gr.Markdown("### Advanced Analysis Tools")
+                
+                with gr.Tabs() as analysis_tabs:
+                    with gr.Tab("Summaries"):
+                        gr.Markdown("### Generate Document Summaries")
+                        doc_ids_input = gr.Textbox(
+                            label="Document IDs (comma-separated)",
+                            placeholder="doc1, doc2, doc3"
+                        )
+                        summary_type = gr.Radio(
+                            choices=["general", "detailed", "executive"],
+                            value="general",
+                            label="Summary Type"
+                        )
+                        summary_btn = gr.Button("Generate Summary", variant="primary")
+                        summary_output = gr.Markdown(label="Summary")
+                        
+                        summary_btn.click(
+                            fn=summarize_document_ids,
+                            inputs=[doc_ids_input, summary_type],
+                            outputs=summary_output,
+                            concurrency_limit=ANALYSIS_CONCURRENCY_LIMIT,
+                            concurrency_id="analysis"
+                        )
+                    
+                    with gr.Tab("Contradictions"):
+                        gr.Markdown("### Find Contradictory Documents")
+                        contradiction_query = gr.Textbox(
+                            label="Query",
+                            placeholder="e.g., statements about the same event",
+                            lines=2
+                        )
+                        contradiction_btn = gr.Button("Find Contradictions", variant="primary")
+                        contradiction_output = gr.Markdown(label="Contradictions Found")
+                        
+                        contradiction_btn.click(
+                            fn=find_contradictions,
+                            inputs=contradiction_query,
+                            outputs=contradiction_output,
+                            concurrency_limit=ANALYSIS_CONCURRENCY_LIMIT,
+                            concurrency_id="analysis"
+                        )
+                    
+                    with gr.Tab("Relationships"):
+                        gr.Markdown("### Analyze Entity Relationships")
+                        entities_input = gr.Textbox(
+                            label="Entities (comma-separated)",
+                            placeholder="Person A, Person B, Company C",
+                            lines=2
+                        )
+                        relationship_btn = gr.Button("Analyze Relationships", variant="primary")
+                        relationship_output = gr.Markdown(label="Relationship Analysis")
+                        
+                        relationship_btn.click(
+                            fn=analyze_relationships,
+                            inputs=entities_input,
+                            outputs=relationship_output,
+                            concurrency_limit=ANALYSIS_CONCURRENCY_LIMIT,
+                            concurrency_id="analysis"
+                        )
+        
+        gr.Markdown("---")
+        gr.Markdown(f"""
+        ### 🔒 Privacy & Security
+        - All documents are processed locally
+        - No data is sent to external services
+        - Your knowledge base remains private and secure
+        
+        ### 📁 File Storage
+        - **Original files saved to:** `{DOCUMENTS_STORAGE_DIR}`
+        - **Knowledge base data:** `{kb_dir_absolute}`
+        - Files are permanently stored and will not be deleted automatically
+        """)
+    return demo
+
+
+def main():
+    """Start the web server (run through main.py)"""
+    print("\n" + "="*60)
+    print("Starting Private AI Litigation Knowledge System")
+    print("="*60)
+    
+    # Get configuration values
+    if Config:
+        Config.print_config_summary()
+        server_name = Config.SERVER_NAME
+        server_port = Config.SERVER_PORT
+        share = Config.SHARE
+        auth_tuple = Config.get_auth_tuple()
+    else:
+        server_name = "127.0.0.1"
+        server_port = 7860
+        share = False
+        auth_tuple = None
+        print("⚠ Running with default configuration (no config module)")
+    
+    print(f"\n✓ Server starting on http://{server_name}:{server_port}")
+    if server_name == "127.0.0.1":
+        print(f"✓ Also accessible at http://localhost:{server_port}")
+        print(f"\n⚠ IMPORTANT: Use http://localhost:{server_port} or http://127.0.0.1:{server_port}")
+        print("   Do NOT use http://0.0.0.0:{server_port} in your browser")
+    if auth_tuple:
+        print(f"\n🔒 Authentication ENABLED - Login required to access the system")
+    else:
+        print(f"\n⚠ Authentication DISABLED - System is open to anyone")
+        print("   Set AUTH_ENABLED=true in .env file to enable authentication")
+    print("\n" + "="*60 + "\n")
+    
+    # Load the knowledge base and embedding model in the background while the UI starts
+    threading.Thread(target=_warm_up, daemon=True).start()
+    
+    demo = create_interface()
+    # Let several requests (e.g. an upload and a search) run at once instead of one at a time;
+    # per-handler limits above override the default
+    demo.queue(max_size=QUEUE_MAX_SIZE, default_concurrency_limit=4)
+    demo.launch(
+        share=share, 
+        server_name=server_name, 
+        auth=auth_tuple,  # Will be None if auth is disabled
+        server_port=server_port, 
+        theme=gr.themes.Soft(),
+        pwa=True,
+        footer_links=[""]
+    )
+
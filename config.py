@@ -35,13 +35,39 @@ def load_environment():
 load_environment()
 
 
+_TRUE_VALUES = ("true", "1", "yes")
+
+
+def _parse_bool(value: Optional[str]) -> bool:
+    """Parse a boolean flag the way the .env file documents it"""
+    return value is not None and value.strip().lower() in _TRUE_VALUES
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean environment variable once"""
+    value = os.getenv(name)
+    return default if value is None else _parse_bool(value)
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer environment variable once, falling back to the default if invalid"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"⚠ Invalid integer for {name}: {value!r}. Using default {default}")
+        return default
+
+
 class Config:
     """Configuration class for managing secrets and settings"""
     
     # Authentication
     AUTH_USERNAME: Optional[str] = os.getenv("AUTH_USERNAME", None)
     AUTH_PASSWORD: Optional[str] = os.getenv("AUTH_PASSWORD", None)
-    AUTH_ENABLED: bool = os.getenv("AUTH_ENABLED", "false").lower() in ("true", "1", "yes")
+    AUTH_ENABLED: bool = _env_bool("AUTH_ENABLED")
     
     # API Keys (if needed for future AI services)
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY", None)
@@ -51,31 +77,40 @@ class Config:
     
     # Server Configuration
     SERVER_NAME: str = os.getenv("SERVER_NAME", "127.0.0.1")
-    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "7860"))
-    SHARE: bool = os.getenv("SHARE", "false").lower() in ("true", "1", "yes")
+    SERVER_PORT: int = _env_int("SERVER_PORT", 7860)
+    SHARE: bool = _env_bool("SHARE")
+    WARMUP_ON_START: bool = _env_bool("WARMUP_ON_START", True)  # Warm models before the first request
     
     # Storage Paths
     DOCUMENTS_STORAGE_DIR: str = os.getenv("DOCUMENTS_STORAGE_DIR", "./uploaded_documents")
     KNOWLEDGE_BASE_DIR: str = os.getenv("KNOWLEDGE_BASE_DIR", "./knowledge_base")
+    PROCESSED_CACHE_DIR: str = os.getenv("PROCESSED_CACHE_DIR", "~/.cache/litigation")  # Empty disables
     
     # Security Settings
     SECRET_KEY: Optional[str] = os.getenv("SECRET_KEY", None)
-    SESSION_TIMEOUT: int = int(os.getenv("SESSION_TIMEOUT", "3600"))  # 1 hour default
+    SESSION_TIMEOUT: int = _env_int("SESSION_TIMEOUT", 3600)  # 1 hour default
+    
+    # AI Assistant
+    CHAT_HISTORY_TURNS: int = _env_int("CHAT_HISTORY_TURNS", 8)  # Most recent turns passed to the analyzer
+    QUERY_EXPANSION: bool = _env_bool("QUERY_EXPANSION")  # Also search a keyword-only variant of each question
     
     # Google Drive Integration
-    GOOGLE_DRIVE_ENABLED: bool = os.getenv("GOOGLE_DRIVE_ENABLED", "false").lower() in ("true", "1", "yes")
+    GOOGLE_DRIVE_ENABLED: bool = _env_bool("GOOGLE_DRIVE_ENABLED")
     GOOGLE_DRIVE_CLIENT_ID: Optional[str] = os.getenv("GOOGLE_DRIVE_CLIENT_ID", None)
     GOOGLE_DRIVE_CLIENT_SECRET: Optional[str] = os.getenv("GOOGLE_DRIVE_CLIENT_SECRET", None)
     GOOGLE_DRIVE_CREDENTIALS_FILE: Optional[str] = os.getenv("GOOGLE_DRIVE_CREDENTIALS_FILE", None)  # Path to credentials.json
     GOOGLE_DRIVE_TOKEN_FILE: Optional[str] = os.getenv("GOOGLE_DRIVE_TOKEN_FILE", "./google_drive_token.json")
     GOOGLE_DRIVE_FOLDER_ID: Optional[str] = os.getenv("GOOGLE_DRIVE_FOLDER_ID", None)  # Optional: specific folder to sync
     
+    # Authentication tuple resolved once at import; settings are fixed afterwards
+    _AUTH_TUPLE: Optional[Tuple[str, str]] = (
+        (AUTH_USERNAME, AUTH_PASSWORD) if AUTH_ENABLED and AUTH_USERNAME and AUTH_PASSWORD else None
+    )
+    
     @classmethod
     def get_auth_tuple(cls) -> Optional[Tuple[str, str]]:
         """Get authentication tuple for Gradio if auth is enabled"""
-        if cls.AUTH_ENABLED and cls.AUTH_USERNAME and cls.AUTH_PASSWORD:
-            return (cls.AUTH_USERNAME, cls.AUTH_PASSWORD)
-        return None
+        return cls._AUTH_TUPLE
     
     @classmethod
     def validate_auth_config(cls) -> bool:
@@ -102,6 +137,7 @@ class Config:
         print(f"Share: {cls.SHARE}")
         print(f"Documents Storage: {cls.DOCUMENTS_STORAGE_DIR}")
         print(f"Knowledge Base: {cls.KNOWLEDGE_BASE_DIR}")
+        print(f"Processed Cache: {cls.PROCESSED_CACHE_DIR or 'DISABLED'}")
         print(f"Session Timeout: {cls.SESSION_TIMEOUT}s")
         print(f"Google Drive: {'ENABLED' if cls.GOOGLE_DRIVE_ENABLED else 'DISABLED'}")
         if cls.GOOGLE_DRIVE_ENABLED:
@@ -3,9 +3,19 @@ Document Processing Module
 Handles ingestion and processing of various document types for the litigation system.
 """
 
+import csv
+import functools
+import hashlib
+import io
+import multiprocessing
 import os
 import re
-from typing import Dict, List, Any, Optional
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib.util import find_spec
+from itertools import chain
+from typing import Dict, List, Any, Optional, Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 import email
@@ -13,28 +23,135 @@ from email import policy
 import json
 
 try:
-    import PyPDF2
-    PDF_AVAILABLE = True
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
 except ImportError:
-    PDF_AVAILABLE = False
+    PDFIUM_AVAILABLE = False
 
 try:
-    from docx import Document as DocxDocument
-    DOCX_AVAILABLE = True
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
 except ImportError:
-    DOCX_AVAILABLE = False
+    PYMUPDF_AVAILABLE = False
+
+# Fallback and file-type specific backends are only imported on first use, so
+# workers that never see those file types don't pay their import cost
+PDF_AVAILABLE = find_spec('PyPDF2') is not None
+DOCX_AVAILABLE = find_spec('docx') is not None
+OPENPYXL_AVAILABLE = find_spec('openpyxl') is not None
+PANDAS_AVAILABLE = find_spec('pandas') is not None
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
 
 try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
+    import blake3
+    BLAKE3_AVAILABLE = True
 except ImportError:
-    PANDAS_AVAILABLE = False
+    BLAKE3_AVAILABLE = False
+
+
+# PDFs with more pages than this are extracted across worker processes
+PARALLEL_PDF_MIN_PAGES = 16
+# Smaller files are extracted serially without opening them first to count pages
+PARALLEL_PDF_MIN_BYTES = 2 * 1024 * 1024
+
+# Bump whenever extraction output changes so cached results are not reused
+EXTRACTOR_VERSION = "1"
+
+# Processed-document cache size (least recently used entries are pruned)
+PROCESSED_CACHE_MAX_ENTRIES = 2000
+# Entries allowed beyond that before a prune, so pruning happens in batches
+PROCESSED_CACHE_PRUNE_SLACK = 64
+
+# Characters lowered at a time when scanning large content case-insensitively
+_LOWER_WINDOW = 1 << 20
+
+
+def _compile_linear(pattern: str):
+    """Compile with RE2 (linear-time matching) when available, otherwise with re"""
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass  # Syntax RE2 does not support
+    return re.compile(pattern)
+
+
+# Metadata extraction patterns, compiled once per process (RE2 when installed)
+# and shared copy-on-write by forked workers
+_PARTY_PATTERNS = [
+    _compile_linear(r'(?:Plaintiff|Defendant|Appellant|Appellee|Petitioner|Respondent)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'),
+    _compile_linear(r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s+v\.\s+([A-Z][a-z]+\s+[A-Z][a-z]+)'),
+    _compile_linear(r'(?:Mr\.|Ms\.|Mrs\.|Dr\.)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)'),
+]
+_DATE_PATTERNS = [
+    _compile_linear(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'),
+    _compile_linear(r'\d{4}[/-]\d{1,2}[/-]\d{1,2}'),
+    _compile_linear(r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}'),
+    _compile_linear(r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}'),
+]
+
+# Simple keyword extraction based on legal terms
+LEGAL_KEYWORDS = [
+    'contract', 'agreement', 'lawsuit', 'litigation', 'settlement',
+    'breach', 'damages', 'injunction', 'motion', 'pleading',
+    'discovery', 'deposition', 'testimony', 'evidence', 'exhibit',
+    'bankruptcy', 'creditor', 'debtor', 'foreclosure', 'lien',
+    'rico', 'racketeering', 'fraud', 'conspiracy', 'transaction'
+]
+# Keywords match anywhere in the text, as plain substrings; the lookahead also finds
+# keywords that overlap an earlier match
+_TOPICS_RE = re.compile(r'(?=(' + '|'.join(map(re.escape, LEGAL_KEYWORDS)) + r'))', re.IGNORECASE)
+_TOPIC_OVERLAP = max(map(len, LEGAL_KEYWORDS))
+
+
+def _build_topic_automaton():
+    """Build the Aho-Corasick automaton over the legal keywords, if pyahocorasick is installed"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in LEGAL_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_TOPIC_AUTOMATON = _build_topic_automaton()
+
+# Content-based classification rules, in priority order
+_CLASS_RULES = [
+    ('email', ('email',)),
+    ('court_filing', ('motion', 'pleading')),
+    ('contract', ('contract', 'agreement')),
+    ('financial_record', ('invoice', 'payment')),
+    ('deposition', ('deposition', 'testimony')),
+]
+_CLASS_PRIORITY = {token: rank for rank, (_, tokens) in enumerate(_CLASS_RULES) for token in tokens}
+_CLASS_RE = re.compile('|'.join(_CLASS_PRIORITY), re.IGNORECASE | re.ASCII)  # ASCII case folding only, so every match lowercases to a key
 
 
 class DocumentProcessor:
     """Process various document types and extract metadata"""
     
-    def __init__(self):
+    def __init__(self, pdf_workers: Optional[int] = None, cache_dir: Optional[str] = None):
+        # Worker processes for large PDFs (1 disables; use when already inside a pool)
+        self.pdf_workers = pdf_workers or min(8, os.cpu_count() or 1)
+        
+        # Optional on-disk cache of processed results, keyed by file content hash
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
         self.supported_types = {
             '.pdf': self._process_pdf,
             '.txt': self._process_text,
@@ -46,12 +163,16 @@ class DocumentProcessor:
             '.xlsx': self._process_excel,
             '.xls': self._process_excel,
         }
+        
+        self.legal_keywords = LEGAL_KEYWORDS
     
     def process_document(self, file_path: str) -> Dict[str, Any]:
         """Process a document and return extracted content and metadata"""
         try:
             file_path = str(file_path)
-            if not os.path.exists(file_path):
+            try:
+                file_size = os.stat(file_path).st_size
+            except OSError:
                 return {
                     'success': False,
                     'error': f'File not found: {file_path}'
@@ -65,16 +186,24 @@ class DocumentProcessor:
                     'error': f'Unsupported file type: {file_ext}'
                 }
             
+            cache_path = self._cache_path(file_path, file_ext) if self.cache_dir else None
+            cached = self._load_cached(cache_path)
+            if cached is not None:
+                return cached
+            
             processor = self.supported_types[file_ext]
-            result = processor(file_path)
+            result = processor(file_path, file_size)
             
             # Extract additional metadata
-            result['parties'] = self._extract_parties(result.get('content', ''))
-            result['dates'] = self._extract_dates(result.get('content', ''))
-            result['topics'] = self._extract_topics(result.get('content', ''))
-            result['doc_type'] = self._classify_document(result.get('content', ''), file_ext)
+            content = result.get('content', '')
+            result['parties'] = self._extract_parties(content)
+            result['dates'] = self._extract_dates(content)
+            result['topics'] = self._extract_topics(content)
+            result['doc_type'] = self._classify_document(content, file_ext)
             
             result['success'] = True
+            if cache_path is not None and 'error' not in result:
+                self._store_cached(cache_path, result)
             return result
             
         except Exception as e:
@@ -85,27 +214,162 @@ class DocumentProcessor:
                 'doc_type': 'unknown'
             }
     
-    def _process_pdf(self, file_path: str) -> Dict[str, Any]:
-        """Extract text from PDF"""
-        if not PDF_AVAILABLE:
+    def _cache_path(self, file_path: str, file_ext: str) -> Path:
+        """Cache file for this document: content hash + extension + extractor version"""
+        hasher = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.blake2b(digest_size=32)
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                hasher.update(block)
+        return self.cache_dir / f"{hasher.hexdigest()}{file_ext}.v{EXTRACTOR_VERSION}.json"
+    
+    def _load_cached(self, cache_path: Optional[Path]) -> Optional[Dict[str, Any]]:
+        """Load a cached result, marking it recently used"""
+        if cache_path is None or not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(cache_path)
+            return result
+        except (OSError, ValueError):
+            return None
+    
+    def _store_cached(self, cache_path: Path, result: Dict[str, Any]):
+        """Write a result to the cache atomically, pruning old entries now and then"""
+        try:
+            temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"⚠ Could not cache processed document: {e}")
+            return
+        
+        self._prune_cache()
+    
+    def _prune_cache(self):
+        """Drop the oldest cache entries once the directory holds too many
+        
+        Based on the directory itself, since every worker process writes with its own processor.
+        """
+        try:
+            with os.scandir(self.cache_dir) as listing:
+                entries = [entry for entry in listing if entry.name.endswith('.json')]
+            if len(entries) <= PROCESSED_CACHE_MAX_ENTRIES + PROCESSED_CACHE_PRUNE_SLACK:
+                return
+            
+            dated = []
+            for entry in entries:
+                try:
+                    dated.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass  # Replaced or pruned by another worker meanwhile
+            dated.sort(reverse=True)
+            for _, path in dated[PROCESSED_CACHE_MAX_ENTRIES:]:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+        except OSError as e:
+            print(f"⚠ Could not prune processed-document cache: {e}")
+    
+    def _process_pdf(self, file_path: str, file_size: Optional[int] = None) -> Dict[str, Any]:
+        """Extract text from PDF (pypdfium2, then PyMuPDF, then PyPDF2)"""
+        if not (PDFIUM_AVAILABLE or PYMUPDF_AVAILABLE or PDF_AVAILABLE):
             return {
                 'content': '',
-                'error': 'PyPDF2 not installed. Install with: pip install PyPDF2'
+                'error': 'No PDF library installed. Install with: pip install pypdfium2'
             }
         
         try:
-            content_parts = []
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    content_parts.append(page.extract_text())
-            
-            content = '\n'.join(content_parts)
-            return {'content': content}
+            # Write pages into one buffer as they are extracted instead of
+            # holding every page string alongside the joined copy
+            buffer = io.StringIO()
+            for page_number, page_text in enumerate(self._process_pdf_stream(file_path, file_size)):
+                if page_number:
+                    buffer.write('\n')
+                buffer.write(page_text)
+            return {'content': buffer.getvalue()}
         except Exception as e:
             return {'content': '', 'error': str(e)}
     
-    def _process_text(self, file_path: str) -> Dict[str, Any]:
+    def _process_pdf_stream(self, file_path: str, file_size: Optional[int] = None) -> Iterator[str]:
+        """Yield the text of each PDF page in order using the best available backend"""
+        if PDFIUM_AVAILABLE:
+            backend, page_count = '_pdf_pages_pdfium', self._pdf_page_count_pdfium
+        elif PYMUPDF_AVAILABLE:
+            backend, page_count = '_pdf_pages_pymupdf', self._pdf_page_count_pymupdf
+        else:
+            return self._pdf_pages_pypdf2(file_path)
+        
+        if self.pdf_workers > 1 and (file_size is None or file_size >= PARALLEL_PDF_MIN_BYTES):
+            pages = page_count(file_path)
+            if pages > PARALLEL_PDF_MIN_PAGES:
+                return self._pdf_pages_parallel(backend, file_path, pages)
+        return getattr(self, backend)(file_path)
+    
+    def _pdf_pages_parallel(self, backend: str, file_path: str, pages: int) -> Iterator[str]:
+        """
+        Extract page ranges in worker processes, yielding pages in order
+        
+        pdfium and MuPDF are not thread-safe, so each worker opens its own copy
+        of the document rather than sharing one across threads.
+        """
+        workers = min(self.pdf_workers, pages)
+        step = -(-pages // workers)
+        starts = range(0, pages, step)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for page_texts in executor.map(_pdf_page_range_text, [backend] * len(starts),
+                                           [file_path] * len(starts), starts,
+                                           [start + step for start in starts]):
+                yield from page_texts
+    
+    @staticmethod
+    def _pdf_page_count_pdfium(file_path: str) -> int:
+        """Count pages with pypdfium2"""
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    
+    @staticmethod
+    def _pdf_page_count_pymupdf(file_path: str) -> int:
+        """Count pages with PyMuPDF"""
+        with fitz.open(file_path) as pdf:
+            return pdf.page_count
+    
+    @staticmethod
+    def _pdf_pages_pdfium(file_path: str, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Extract per-page text with pypdfium2"""
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for page_index in range(start, min(len(pdf), stop or len(pdf))):
+                page = pdf[page_index]
+                textpage = page.get_textpage()
+                yield textpage.get_text_range()
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    
+    @staticmethod
+    def _pdf_pages_pymupdf(file_path: str, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Extract per-page text with PyMuPDF"""
+        with fitz.open(file_path) as pdf:
+            for page_index in range(start, min(pdf.page_count, stop or pdf.page_count)):
+                yield pdf[page_index].get_text()
+    
+    @staticmethod
+    def _pdf_pages_pypdf2(file_path: str) -> Iterator[str]:
+        """Extract per-page text with PyPDF2"""
+        import PyPDF2
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page in pdf_reader.pages:
+                yield page.extract_text()
+    
+    def _process_text(self, file_path: str, file_size: Optional[int] = None) -> Dict[str, Any]:
         """Extract text from plain text file"""
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
@@ -114,7 +378,7 @@ class DocumentProcessor:
         except Exception as e:
             return {'content': '', 'error': str(e)}
     
-    def _process_docx(self, file_path: str) -> Dict[str, Any]:
+    def _process_docx(self, file_path: str, file_size: Optional[int] = None) -> Dict[str, Any]:
         """Extract text from Word document"""
         if not DOCX_AVAILABLE:
             return {
@@ -123,6 +387,7 @@ class DocumentProcessor:
             }
         
         try:
+            from docx import Document as DocxDocument
             doc = DocxDocument(file_path)
             content_parts = []
             for paragraph in doc.paragraphs:
@@ -132,7 +397,7 @@ class DocumentProcessor:
         except Exception as e:
             return {'content': '', 'error': str(e)}
     
-    def _process_email(self, file_path: str) -> Dict[str, Any]:
+    def _process_email(self, file_path: str, file_size: Optional[int] = None) -> Dict[str, Any]:
         """Extract content from email file"""
         try:
             with open(file_path, 'rb') as file:
@@ -147,8 +412,14 @@ class DocumentProcessor:
             content_parts.append(f"Date: {msg.get('Date', 'Unknown')}")
             content_parts.append("")
             
-            # Extract body
-            if msg.is_multipart():
+            # Extract body: the one canonical body part, skipping attachments and alternatives
+            body = msg.get_body(preferencelist=('plain', 'html'))
+            if body is not None:
+                try:
+                    content_parts.append(body.get_content())
+                except (LookupError, UnicodeError):
+                    content_parts.append(body.get_payload(decode=True).decode('utf-8', errors='ignore'))
+            elif msg.is_multipart():
                 for part in msg.walk():
                     if part.get_content_type() == "text/plain":
                         content_parts.append(part.get_payload(decode=True).decode('utf-8', errors='ignore'))
@@ -160,105 +431,158 @@ class DocumentProcessor:
         except Exception as e:
             return {'content': '', 'error': str(e)}
     
-    def _process_csv(self, file_path: str) -> Dict[str, Any]:
+    def _process_csv(self, file_path: str, file_size: Optional[int] = None) -> Dict[str, Any]:
         """Extract content from CSV file"""
-        if not PANDAS_AVAILABLE:
-            return {
-                'content': '',
-                'error': 'pandas not installed. Install with: pip install pandas'
-            }
-        
         try:
-            df = pd.read_csv(file_path)
-            content = df.to_string()
-            return {'content': content}
+            # Stream rows straight to tab-separated text; no DataFrame or padded formatting
+            buffer = io.StringIO()
+            with open(file_path, 'r', encoding='utf-8', errors='ignore', newline='') as file:
+                for row in csv.reader(file):
+                    buffer.write('\t'.join(row))
+                    buffer.write('\n')
+            return {'content': buffer.getvalue()}
         except Exception as e:
             return {'content': '', 'error': str(e)}
     
-    def _process_excel(self, file_path: str) -> Dict[str, Any]:
+    def _process_excel(self, file_path: str, file_size: Optional[int] = None) -> Dict[str, Any]:
         """Extract content from Excel file"""
+        if OPENPYXL_AVAILABLE and Path(file_path).suffix.lower() != '.xls':
+            try:
+                return {'content': self._excel_text_openpyxl(file_path)}
+            except Exception as e:
+                return {'content': '', 'error': str(e)}
+        
+        # Legacy .xls (or no openpyxl): fall back to pandas
         if not PANDAS_AVAILABLE:
+            if Path(file_path).suffix.lower() == '.xls':
+                return {
+                    'content': '',
+                    'error': 'pandas not installed. Install with: pip install pandas xlrd'
+                }
             return {
                 'content': '',
-                'error': 'pandas not installed. Install with: pip install pandas'
+                'error': 'openpyxl not installed. Install with: pip install openpyxl'
             }
         
         try:
+            import pandas as pd
             df = pd.read_excel(file_path)
             content = df.to_string()
             return {'content': content}
         except Exception as e:
             return {'content': '', 'error': str(e)}
     
+    def _excel_text_openpyxl(self, file_path: str) -> str:
+        """Stream cell values from every sheet as tab-separated rows"""
+        buffer = io.StringIO()
+        for row_text in self._excel_rows(file_path):
+            buffer.write(row_text)
+            buffer.write('\n')
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _excel_rows(file_path: str) -> Iterator[str]:
+        """
+        Yield each non-empty worksheet row as tab-separated text
+        
+        Only one row of cell values is held at a time. Read-only sheets often
+        report large empty ranges; those rows are skipped.
+        """
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                for row in sheet.iter_rows(values_only=True):
+                    if any(value is not None for value in row):
+                        yield '\t'.join('' if value is None else str(value) for value in row)
+        finally:
+            workbook.close()
+    
     def _extract_parties(self, content: str) -> List[str]:
         """Extract party names from content (simple pattern matching)"""
-        parties = []
+        if self._is_blank(content):
+            return []
         
-        # Common legal party patterns
-        patterns = [
-            r'(?:Plaintiff|Defendant|Appellant|Appellee|Petitioner|Respondent)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s+v\.\s+([A-Z][a-z]+\s+[A-Z][a-z]+)',
-            r'(?:Mr\.|Ms\.|Mrs\.|Dr\.)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)',
-        ]
+        parties = filter(None, chain.from_iterable(
+            match.groups()
+            for pattern in _PARTY_PATTERNS
+            for match in pattern.finditer(content)
+        ))
         
-        for pattern in patterns:
-            matches = re.findall(pattern, content)
-            if isinstance(matches[0], tuple) if matches else False:
-                parties.extend([m for match in matches for m in match if m])
-            else:
-                parties.extend(matches)
-        
-        return list(set(parties))[:10]  # Limit to 10 unique parties
+        return self._first_unique(parties, 10)  # Limit to 10 unique parties
+    
+    @staticmethod
+    def _first_unique(items: Iterable[str], limit: int) -> List[str]:
+        """Collect the first `limit` distinct items in order, stopping the scan once full"""
+        seen = {}
+        for item in items:
+            seen[item] = None
+            if len(seen) == limit:
+                break
+        return list(seen)
+    
+    @staticmethod
+    def _is_blank(content: str) -> bool:
+        """True for empty/whitespace-only content (e.g. a processor that failed)"""
+        return not content or content.isspace()
     
     def _extract_dates(self, content: str) -> List[str]:
         """Extract dates from content"""
-        dates = []
+        if self._is_blank(content):
+            return []
         
-        # Various date patterns
-        patterns = [
-            r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
-            r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',
-            r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-            r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}',
-        ]
+        dates = (
+            match.group(0)
+            for pattern in _DATE_PATTERNS
+            for match in pattern.finditer(content)
+        )
         
-        for pattern in patterns:
-            matches = re.findall(pattern, content)
-            dates.extend(matches)
+        return self._first_unique(dates, 20)  # Limit to 20 unique dates
+    
+    @staticmethod
+    def _lowered_windows(content: str, overlap: int) -> Iterator[str]:
+        """
+        Yield lowercase slices covering the content
         
-        return list(set(dates))[:20]  # Limit to 20 unique dates
+        Large content is lowered a window at a time so a full lowercase copy
+        of it is never held; windows overlap so no keyword is split.
+        """
+        if len(content) <= _LOWER_WINDOW:
+            yield content.lower()
+            return
+        for start in range(0, len(content), _LOWER_WINDOW):
+            yield content[start:start + _LOWER_WINDOW + overlap].lower()
     
     def _extract_topics(self, content: str) -> List[str]:
         """Extract topics/keywords from content"""
-        # Simple keyword extraction based on legal terms
-        legal_keywords = [
-            'contract', 'agreement', 'lawsuit', 'litigation', 'settlement',
-            'breach', 'damages', 'injunction', 'motion', 'pleading',
-            'discovery', 'deposition', 'testimony', 'evidence', 'exhibit',
-            'bankruptcy', 'creditor', 'debtor', 'foreclosure', 'lien',
-            'rico', 'racketeering', 'fraud', 'conspiracy', 'transaction'
-        ]
+        if self._is_blank(content):
+            return []
         
-        content_lower = content.lower()
-        found_topics = [keyword for keyword in legal_keywords if keyword in content_lower]
+        # One pass over the content for every legal keyword
+        found = set()
+        if _TOPIC_AUTOMATON is not None:
+            for window in self._lowered_windows(content, _TOPIC_OVERLAP):
+                found.update(keyword for _, keyword in _TOPIC_AUTOMATON.iter(window))
+        else:
+            found.update(match.lower() for match in _TOPICS_RE.findall(content))
+        found_topics = [keyword for keyword in LEGAL_KEYWORDS if keyword in found]
         
         return found_topics[:10]  # Limit to 10 topics
     
     def _classify_document(self, content: str, file_ext: str) -> str:
         """Classify document type based on content and extension"""
-        content_lower = content.lower()
-        
-        # Classification rules
-        if 'email' in content_lower or file_ext in ['.eml', '.msg']:
+        if file_ext in ['.eml', '.msg']:
             return 'email'
-        elif 'motion' in content_lower or 'pleading' in content_lower:
-            return 'court_filing'
-        elif 'contract' in content_lower or 'agreement' in content_lower:
-            return 'contract'
-        elif 'invoice' in content_lower or 'payment' in content_lower:
-            return 'financial_record'
-        elif 'deposition' in content_lower or 'testimony' in content_lower:
-            return 'deposition'
+        
+        # Single scan for every rule keyword; the highest-priority rule hit wins
+        best = len(_CLASS_RULES)
+        if not self._is_blank(content):
+            for match in _CLASS_RE.finditer(content):
+                best = min(best, _CLASS_PRIORITY[match.group(0).lower()])
+                if best == 0:
+                    break
+        if best < len(_CLASS_RULES):
+            return _CLASS_RULES[best][0]
         elif file_ext == '.pdf':
             return 'pdf_document'
         elif file_ext in ['.csv', '.xlsx', '.xls']:
@@ -266,3 +590,54 @@ class DocumentProcessor:
         else:
             return 'general_document'
 
+
+def _pdf_page_range_text(backend: str, file_path: str, start: int, stop: int) -> List[str]:
+    """Extract a range of PDF pages in a worker process"""
+    return list(getattr(DocumentProcessor, backend)(file_path, start, stop))
+
+
+@functools.lru_cache(maxsize=None)
+def _worker_processor(cache_dir: Optional[str], pdf_workers: int) -> 'DocumentProcessor':
+    """DocumentProcessor reused by every file a worker process handles"""
+    return DocumentProcessor(pdf_workers=pdf_workers, cache_dir=cache_dir)
+
+
+def process_document_file(file_path: str, cache_dir: Optional[str] = None,
+                          pdf_workers: int = 1) -> Dict[str, Any]:
+    """Process one document in a worker process
+    
+    pdf_workers is 1 by default (a batch already runs one file per process); pass more when
+    the batch leaves CPUs idle, so the pages of a large PDF are extracted in parallel.
+    """
+    return _worker_processor(cache_dir, pdf_workers).process_document(file_path)
+
+
+# Document worker processes shared by every upload and import (started on first use)
+_document_pool = None
+_document_pool_lock = threading.Lock()
+
+
+def _new_document_pool() -> ProcessPoolExecutor:
+    """Pool of one worker per CPU, each started from a fresh interpreter
+    
+    Forking the server would copy its web server and model threads into every worker, so
+    workers come from the fork server where available and are spawned elsewhere (Windows).
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                               mp_context=multiprocessing.get_context(method))
+
+
+def submit_document_file(file_path: str, cache_dir: Optional[str] = None,
+                         pdf_workers: int = 1) -> Future:
+    """Queue process_document_file on the shared worker pool, replacing the pool if a worker died"""
+    global _document_pool
+    with _document_pool_lock:
+        if _document_pool is None:
+            _document_pool = _new_document_pool()
+        try:
+            return _document_pool.submit(process_document_file, file_path, cache_dir, pdf_workers)
+        except BrokenProcessPool:
+            # A crashed worker (e.g. in a PDF library) breaks the whole pool; later files get a new one
+            _document_pool = _new_document_pool()
+            return _document_pool.submit(process_document_file, file_path, cache_dir, pdf_workers)
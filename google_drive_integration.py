@@ -5,10 +5,15 @@ Handles authentication and file retrieval from Google Drive.
 
 import os
 import json
+import functools
+import hashlib
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 import tempfile
 import shutil
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from google.auth.transport.requests import Request
@@ -27,6 +32,73 @@ except ImportError:
 # Google Drive API scopes
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
 
+# Concurrent downloads per folder import (network-bound)
+DEFAULT_DOWNLOAD_WORKERS = 8
+
+# Drive API maximum for list page size
+LIST_PAGE_SIZE = 1000
+
+# Folder IDs OR-ed into one files.list query (keeps the query string well under Drive's limits)
+LIST_PARENTS_PER_QUERY = 40
+
+# Metadata fetched per listed file (name/type for processing, md5 to verify downloads, size/date for display)
+LIST_FILE_FIELDS = "nextPageToken, files(id, name, mimeType, size, md5Checksum, modifiedTime)"
+
+# Large download chunks keep multi-MB files to a few HTTP range requests
+DOWNLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Retries (with exponential backoff) for each download chunk on 5xx/429/connection errors
+DOWNLOAD_RETRIES = 5
+
+# Authenticated credentials and Drive service pools shared across instances, keyed by token file
+_SERVICE_CACHE: Dict[str, tuple] = {}
+
+
+@functools.lru_cache(maxsize=32)
+def _mime_query(mime_types: tuple) -> str:
+    """Drive query clause matching any of the MIME types (built once per set of types)"""
+    return "(" + " or ".join([f"mimeType='{mime}'" for mime in mime_types]) + ")"
+
+
+class _HashingWriter:
+    """File wrapper that MD5-hashes bytes as they are written"""
+    
+    def __init__(self, file):
+        self.file = file
+        self.md5 = hashlib.md5()
+    
+    def write(self, data: bytes) -> int:
+        self.md5.update(data)
+        return self.file.write(data)
+
+
+class _ServicePool:
+    """
+    Drive services built from one set of credentials, each used by one thread at a time
+    
+    googleapiclient services share one non-thread-safe HTTP connection, so
+    worker threads borrow an idle service (building one only when all are
+    busy) and return it afterwards, keeping its connection open for the next call.
+    """
+    
+    def __init__(self, creds, service):
+        self.creds = creds
+        self._idle = [service]
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def borrow(self):
+        with self._lock:
+            service = self._idle.pop() if self._idle else None
+        if service is None:
+            service = build('drive', 'v3', credentials=self.creds, cache_discovery=False)
+        try:
+            yield service
+        finally:
+            with self._lock:
+                self._idle.append(service)
+
 
 class GoogleDriveIntegration:
     """Handle Google Drive authentication and file operations"""
@@ -49,14 +121,26 @@ class GoogleDriveIntegration:
         self.token_file = token_file or "./google_drive_token.json"
         self.service = None
         self.creds = None
+        self._services = None  # _ServicePool for worker threads
         
-    def authenticate(self) -> bool:
+    def authenticate(self, interactive: bool = True) -> bool:
         """
         Authenticate with Google Drive API
         
+        Args:
+            interactive: Run the browser login flow if there is no usable saved token
+        
         Returns:
             True if authentication successful, False otherwise
         """
+        # Reuse a service already built for this token (skips discovery and TLS setup)
+        cached = _SERVICE_CACHE.get(self.token_file)
+        if cached is not None:
+            creds, service, services = cached
+            if creds.valid or creds.refresh_token:
+                self.creds, self.service, self._services = creds, service, services
+                return True
+        
         if not self.credentials_file or not os.path.exists(self.credentials_file):
             print(f"⚠ Google Drive credentials file not found: {self.credentials_file}")
             return False
@@ -79,6 +163,8 @@ class GoogleDriveIntegration:
                     self.creds = None
             
             if not self.creds:
+                if not interactive:
+                    return False
                 try:
                     flow = InstalledAppFlow.from_client_secrets_file(
                         self.credentials_file, SCOPES
@@ -99,19 +185,28 @@ class GoogleDriveIntegration:
         
         # Build the Drive service
         try:
-            self.service = build('drive', 'v3', credentials=self.creds)
+            self.service = build('drive', 'v3', credentials=self.creds, cache_discovery=False)
+            self._services = _ServicePool(self.creds, self.service)
+            _SERVICE_CACHE[self.token_file] = (self.creds, self.service, self._services)
             return True
         except Exception as e:
             print(f"✗ Error building Drive service: {e}")
             return False
     
-    def list_files(self, folder_id: Optional[str] = None, mime_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    def _borrow_service(self):
+        """Borrow a Drive service for exclusive use by the current thread"""
+        return self._services.borrow()
+    
+    def list_files(self, folder_id: Optional[str] = None, mime_types: Optional[Sequence[str]] = None,
+                   parent_folder_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         List files in Google Drive
         
         Args:
             folder_id: Optional folder ID to list files from (None = all accessible files)
             mime_types: Optional list of MIME types to filter (e.g., ['application/pdf'])
+            parent_folder_ids: Optional further folder IDs; files in any of the folders are listed,
+                               with up to LIST_PARENTS_PER_QUERY folders per query
         
         Returns:
             List of file metadata dictionaries
@@ -120,47 +215,59 @@ class GoogleDriveIntegration:
             if not self.authenticate():
                 return []
         
+        folder_ids = list(dict.fromkeys(([folder_id] if folder_id else []) + list(parent_folder_ids or [])))
+        mime_query = _mime_query(tuple(mime_types)) if mime_types else None
+        
+        # Build one query per group of folders
+        queries = []
+        for start in range(0, len(folder_ids), LIST_PARENTS_PER_QUERY):
+            group = folder_ids[start:start + LIST_PARENTS_PER_QUERY]
+            parents_query = "(" + " or ".join([f"'{fid}' in parents" for fid in group]) + ")"
+            queries.append(f"{parents_query} and {mime_query}" if mime_query else parents_query)
+        if not folder_ids:
+            queries.append(mime_query)
+        
         try:
-            files = []
-            page_token = None
-            
-            # Build query
-            query_parts = []
-            if folder_id:
-                query_parts.append(f"'{folder_id}' in parents")
-            if mime_types:
-                mime_query = " or ".join([f"mimeType='{mime}'" for mime in mime_types])
-                query_parts.append(f"({mime_query})")
-            
-            query = " and ".join(query_parts) if query_parts else None
-            
+            if len(queries) == 1:
+                return self._list_query(queries[0])
+            # Page through the folder groups concurrently
+            with ThreadPoolExecutor(max_workers=min(DEFAULT_DOWNLOAD_WORKERS, len(queries))) as executor:
+                return [file for files in executor.map(self._list_query, queries) for file in files]
+        except HttpError as error:
+            print(f"✗ Error listing files: {error}")
+            return []
+    
+    def _list_query(self, query: Optional[str]) -> List[Dict[str, Any]]:
+        """All files matching one files.list query, following page tokens"""
+        files = []
+        page_token = None
+        with self._borrow_service() as service:
             while True:
-                results = self.service.files().list(
+                results = service.files().list(
                     q=query,
-                    pageSize=100,
-                    fields="nextPageToken, files(id, name, mimeType, size, modifiedTime, webViewLink)",
+                    pageSize=LIST_PAGE_SIZE,
+                    fields=LIST_FILE_FIELDS,
                     pageToken=page_token
                 ).execute()
                 
-                items = results.get('files', [])
-                files.extend(items)
+                files.extend(results.get('files', []))
                 
                 page_token = results.get('nextPageToken')
                 if not page_token:
                     break
-            
-            return files
-        except HttpError as error:
-            print(f"✗ Error listing files: {error}")
-            return []
+        
+        return files
     
-    def download_file(self, file_id: str, destination_path: Optional[str] = None) -> Optional[str]:
+    def download_file(self, file_id: str, destination_path: Optional[str] = None,
+                      file_metadata: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """
         Download a file from Google Drive
         
         Args:
             file_id: Google Drive file ID
             destination_path: Optional destination path (creates temp file if not provided)
+            file_metadata: Optional metadata with 'name', 'mimeType' and 'md5Checksum'
+                           (e.g. from list_files), saves fetching it again
         
         Returns:
             Path to downloaded file, or None if error
@@ -170,26 +277,37 @@ class GoogleDriveIntegration:
                 return None
         
         try:
-            # Get file metadata
-            file_metadata = self.service.files().get(fileId=file_id).execute()
-            file_name = file_metadata.get('name', 'unknown_file')
-            mime_type = file_metadata.get('mimeType', '')
-            
-            # Determine destination
-            if not destination_path:
-                # Create temp file with appropriate extension
-                suffix = self._get_file_extension(file_name, mime_type)
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-                destination_path = temp_file.name
-                temp_file.close()
+            with self._borrow_service() as service:
+                # Get file metadata unless the caller already has it
+                if file_metadata is None:
+                    file_metadata = service.files().get(fileId=file_id, fields="name, mimeType, md5Checksum").execute()
+                file_name = file_metadata.get('name', 'unknown_file')
+                mime_type = file_metadata.get('mimeType', '')
+                
+                # Determine destination
+                if not destination_path:
+                    # Create temp file with appropriate extension
+                    suffix = self._get_file_extension(file_name, mime_type)
+                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+                    destination_path = temp_file.name
+                    temp_file.close()
+                
+                # Download file; a failed chunk is retried from the last completed byte
+                # offset (HTTP Range), not from the start of the file
+                request = service.files().get_media(fileId=file_id)
+                with open(destination_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                    writer = _HashingWriter(f)
+                    downloader = MediaIoBaseDownload(writer, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+                    done = False
+                    while not done:
+                        status, done = downloader.next_chunk(num_retries=DOWNLOAD_RETRIES)
             
-            # Download file
-            request = self.service.files().get_media(fileId=file_id)
-            with open(destination_path, 'wb') as f:
-                downloader = MediaIoBaseDownload(f, request)
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
+            # Verify integrity (Google Workspace files have no checksum)
+            expected_md5 = file_metadata.get('md5Checksum')
+            if expected_md5 and writer.md5.hexdigest() != expected_md5:
+                print(f"✗ Checksum mismatch for {file_name}; discarding {destination_path}")
+                os.remove(destination_path)
+                return None
             
             print(f"✓ Downloaded: {file_name} -> {destination_path}")
             return destination_path
@@ -199,7 +317,8 @@ class GoogleDriveIntegration:
             return None
     
     def download_files_from_folder(self, folder_id: str, destination_dir: str, 
-                                   mime_types: Optional[List[str]] = None) -> List[str]:
+                                   mime_types: Optional[List[str]] = None,
+                                   max_workers: int = DEFAULT_DOWNLOAD_WORKERS) -> List[str]:
         """
         Download all files from a Google Drive folder
         
@@ -207,35 +326,47 @@ class GoogleDriveIntegration:
             folder_id: Google Drive folder ID
             destination_dir: Directory to save files
             mime_types: Optional list of MIME types to filter
+            max_workers: Concurrent downloads
         
         Returns:
             List of paths to downloaded files
         """
         files = self.list_files(folder_id=folder_id, mime_types=mime_types)
-        downloaded_paths = []
+        jobs = self._plan_folder_downloads(files, destination_dir)
+        if not jobs:
+            return []
+        
+        # Downloads are network-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            downloaded = list(executor.map(lambda job: self.download_file(*job), jobs))
         
+        return [path for path in downloaded if path]
+    
+    def _plan_folder_downloads(self, files: List[Dict[str, Any]], destination_dir: str) -> List[tuple]:
+        """Pick a unique destination path for every file before downloading in parallel"""
         destination_path = Path(destination_dir)
         destination_path.mkdir(parents=True, exist_ok=True)
         
+        jobs = []
+        reserved = set()
         for file_info in files:
             file_id = file_info['id']
             file_name = file_info['name']
             dest_path = destination_path / file_name
             
-            # Avoid overwriting - add number if exists
+            # Avoid overwriting - add number if exists (on disk or earlier in this batch)
             counter = 1
             original_dest = dest_path
-            while dest_path.exists():
+            while dest_path.exists() or dest_path in reserved:
                 stem = original_dest.stem
                 suffix = original_dest.suffix
                 dest_path = destination_path / f"{stem}_{counter}{suffix}"
                 counter += 1
             
-            downloaded = self.download_file(file_id, str(dest_path))
-            if downloaded:
-                downloaded_paths.append(downloaded)
+            reserved.add(dest_path)
+            jobs.append((file_id, str(dest_path), file_info))
         
-        return downloaded_paths
+        return jobs
     
     def _get_file_extension(self, file_name: str, mime_type: str) -> str:
         """Get file extension from name or MIME type"""
@@ -275,9 +406,10 @@ class GoogleDriveIntegration:
                 return None
         
         try:
-            request = self.service.files().export_media(fileId=file_id, mimeType=mime_type)
-            with open(destination_path, 'wb') as f:
-                downloader = MediaIoBaseDownload(f, request)
+            with self._borrow_service() as service, \
+                    open(destination_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                request = service.files().export_media(fileId=file_id, mimeType=mime_type)
+                downloader = MediaIoBaseDownload(f, request, chunksize=DOWNLOAD_CHUNK_SIZE)
                 done = False
                 while not done:
                     status, done = downloader.next_chunk()
@@ -288,20 +420,24 @@ class GoogleDriveIntegration:
             return None
 
 
+# MIME types supported by the document processor
+SUPPORTED_MIME_TYPES = (
+    'application/pdf',
+    'text/plain',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/msword',
+    'message/rfc822',
+    'application/vnd.ms-outlook',
+    'text/csv',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.ms-excel',
+    # Google Workspace formats (will be exported)
+    'application/vnd.google-apps.document',
+    'application/vnd.google-apps.spreadsheet',
+    'application/vnd.google-apps.presentation',
+)
+
+
 def get_supported_mime_types() -> List[str]:
     """Get list of MIME types supported by the document processor"""
-    return [
-        'application/pdf',
-        'text/plain',
-        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'application/msword',
-        'message/rfc822',
-        'application/vnd.ms-outlook',
-        'text/csv',
-        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        'application/vnd.ms-excel',
-        # Google Workspace formats (will be exported)
-        'application/vnd.google-apps.document',
-        'application/vnd.google-apps.spreadsheet',
-        'application/vnd.google-apps.presentation',
-    ]
+    return list(SUPPORTED_MIME_TYPES)
@@ -4,9 +4,14 @@ Manages document storage, indexing, and retrieval using vector embeddings.
 """
 
 import os
+import re
 import json
+import math
 import hashlib
-from typing import List, Dict, Any, Optional
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 import numpy as np
@@ -17,12 +22,155 @@ try:
 except ImportError:
     EMBEDDINGS_AVAILABLE = False
 
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 try:
     import faiss
     FAISS_AVAILABLE = True
 except ImportError:
     FAISS_AVAILABLE = False
 
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes (orjson when installed)"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+# Journaled adds/deletes between full snapshots of metadata, embeddings and index
+SNAPSHOT_EVERY = 1000
+
+# Keyword search terms
+_TOKEN_RE = re.compile(r'\w+')
+
+# Texts per SentenceTransformer forward pass when embedding in bulk
+EMBEDDING_BATCH_SIZE = 64
+
+# SQLite variables per lookup in the persistent embedding cache (SQLite's default limit is 999)
+EMBEDDING_CACHE_LOOKUP_BATCH = 500
+
+# Recent query embeddings kept in memory (a query is often embedded by several callers,
+# e.g. the response cache and then the search itself)
+QUERY_EMBEDDING_CACHE_SIZE = 256
+
+# Rows preallocated for the embedding matrix; capacity doubles whenever it fills up
+EMBEDDING_INITIAL_CAPACITY = 1024
+
+# Index tiers by corpus size: fp16 scalar quantized (half the bytes of float32, needs no
+# training) -> 8-bit scalar quantized (4x smaller, still exhaustive) -> IVF-PQ, each
+# switched to once there are enough vectors to train on
+SQ_MIN_TRAIN = 256
+
+# IVF-PQ settings
+# (faiss wants ~39 training points per k-means centroid, both for IVF lists and PQ codes)
+IVF_TRAIN_FACTOR = 39
+IVF_NPROBE = 8
+PQ_SUBQUANTIZERS = 48  # must divide the embedding dimension (384 / 48 = 8)
+PQ_BITS = 8
+
+# IVF lists are picked with an HNSW graph over the centroids instead of scanning them all
+# (plain HNSW cannot be the main index: it does not support removing vectors)
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64
+
+
+# Above this many documents, searches shortlist candidates by Hamming distance over the
+# embeddings' sign bits (1 bit per dimension, XOR + popcount) and rerank the shortlist exactly
+BINARY_PREFILTER_MIN_DOCS = 200_000
+BINARY_PREFILTER_OVERSAMPLE = 10  # Shortlist size as a multiple of top_k
+BINARY_PACK_ROWS = 65536  # Rows binarized at a time when building the prefilter index
+
+# Searches run on a GPU copy of the index once the corpus is this large (and a GPU is present)
+GPU_MIN_DOCS = 100_000
+
+
+def _ivf_nlist(count: int) -> int:
+    """Number of IVF partitions for a corpus of this size"""
+    return max(4, int(4 * math.sqrt(count)))
+
+
+# Sentence embedding model (384 dimensions)
+EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+EMBEDDING_MAX_TOKENS = 256  # Same truncation as the SentenceTransformer model
+
+
+def _cuda_available() -> bool:
+    """Whether PyTorch can use a CUDA GPU"""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+class _QuantizedEncoder:
+    """INT8 ONNX Runtime export of the embedding model for CPU-only machines
+    
+    Exported and quantized once into cache_dir; encode() mirrors SentenceTransformer.encode
+    (mean pooling over tokens).
+    """
+    
+    MODEL_FILE = 'model_quantized.onnx'
+    
+    def __init__(self, cache_dir: Path):
+        cache_dir = Path(cache_dir)
+        if not (cache_dir / self.MODEL_FILE).exists():
+            fp32_dir = cache_dir / 'fp32'
+            ORTModelForFeatureExtraction.from_pretrained(EMBEDDING_MODEL_NAME, export=True).save_pretrained(fp32_dir)
+            ORTQuantizer.from_pretrained(fp32_dir).quantize(
+                save_dir=cache_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+            AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME).save_pretrained(cache_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(cache_dir, file_name=self.MODEL_FILE)
+    
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False) -> np.ndarray:
+        """Embed one text (returns a vector) or a list of texts (returns an (N, dim) matrix)"""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            tokens = self.tokenizer(sentences[start:start + batch_size], padding=True, truncation=True,
+                                    max_length=EMBEDDING_MAX_TOKENS, return_tensors='np')
+            hidden = self.model(**tokens).last_hidden_state
+            mask = tokens['attention_mask'][..., np.newaxis].astype('float32')
+            batches.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+        embeddings = np.concatenate(batches).astype('float32', copy=False) if batches \
+            else np.empty((0, 384), dtype='float32')
+        
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
 
 class KnowledgeBase:
     """Knowledge base with vector storage and semantic search"""
@@ -32,27 +180,64 @@ class KnowledgeBase:
         self.storage_dir.mkdir(exist_ok=True)
         
         self.documents = {}
+        self.version = 0  # Bumped after every add/delete is applied, so callers can tell when cached results are stale
+        self._write_lock = threading.Lock()  # Adds and deletes from concurrent uploads apply one at a time
+        # Held by searches and by writes while they change the indexes, row maps or embeddings
+        # (FAISS CPU indexes cannot be searched while they are being modified)
+        self._lock = threading.RLock()
         self.metadata_file = self.storage_dir / "metadata.json"
         self.embeddings_file = self.storage_dir / "embeddings.npy"
         self.index_file = self.storage_dir / "index.faiss"
+        # Name of the model that produced embeddings.npy and the index
+        self.embedding_model_file = self.storage_dir / "embedding_model.txt"
+        self._embedding_model_recorded = False
+        # Append-only journal of changes since the last snapshot (one JSON line per
+        # add/delete, plus the added embeddings as raw float32 rows)
+        self.journal_file = self.storage_dir / "journal.jsonl"
+        self.journal_embeddings_file = self.storage_dir / "journal_embeddings.bin"
+        self._journal_ops = 0
+        # Model embeddings of every document content seen so far, keyed by content hash, so
+        # re-uploads and rebuilds skip the model
+        self.embedding_cache_file = self.storage_dir / "embedding_cache.sqlite"
+        self._embedding_cache = None  # Opened on first use; False if it cannot be opened
+        self._query_embeddings = OrderedDict()  # query text -> embedding, LRU
+        self._query_embeddings_lock = threading.Lock()  # Queue workers embed queries concurrently
         
         # Initialize embeddings model
-        if EMBEDDINGS_AVAILABLE:
+        self.embedding_model = None
+        self.embedding_dim = 384
+        if ONNX_AVAILABLE and not _cuda_available():
+            # CPU-only: the INT8 ONNX model encodes several times faster than the FP32 PyTorch one
+            try:
+                self.embedding_model = _QuantizedEncoder(self.storage_dir / "embedding_model_int8")
+            except Exception as e:
+                print(f"Warning: Could not load quantized embedding model: {e}")
+        if self.embedding_model is None and EMBEDDINGS_AVAILABLE:
             try:
-                self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-                self.embedding_dim = 384
+                self.embedding_model = SentenceTransformer(
+                    EMBEDDING_MODEL_NAME, device='cuda' if _cuda_available() else 'cpu'
+                )
+                print(f"Embedding model loaded on {self.embedding_model.device}")
             except Exception as e:
                 print(f"Warning: Could not load embedding model: {e}")
-                self.embedding_model = None
-                self.embedding_dim = 384
-        else:
-            self.embedding_model = None
-            self.embedding_dim = 384
+        self.embedding_model_tag = (f"{EMBEDDING_MODEL_NAME}/{type(self.embedding_model).__name__}"
+                                    if self.embedding_model is not None else "hash")
         
         # Initialize FAISS index
         self.index = None
-        self.embeddings = []
+        # Embeddings live in the first _emb_n rows of a preallocated float32 matrix
+        self._emb_mat = np.empty((0, self.embedding_dim), dtype='float32')
+        self._emb_n = 0
         self.doc_ids = []
+        self._doc_rows = {}  # doc_id -> row in doc_ids/embeddings
+        self._faiss_ids = {}  # 63-bit FAISS id -> doc_id
+        self._postings = None  # term -> {doc_id: term frequency}, built on first keyword search
+        self._posting_arrays = {}  # term -> (rows, term frequencies) as arrays, built on first use
+        # GPU search replica of self.index (the CPU index stays the one that is updated and saved)
+        self._use_gpu = FAISS_AVAILABLE and hasattr(faiss, 'get_num_gpus') and faiss.get_num_gpus() > 0
+        self._gpu_resources = None
+        self._gpu_index = None
+        self._bin_index = None  # Sign-bit prefilter index, built on the first search of a large corpus
         
         # Load existing data
         self._load_data()
@@ -62,99 +247,546 @@ class KnowledgeBase:
         # Load metadata
         if self.metadata_file.exists():
             try:
-                with open(self.metadata_file, 'r') as f:
-                    self.documents = json.load(f)
+                with open(self.metadata_file, 'rb') as f:
+                    self.documents = _json_loads(f.read())
             except Exception as e:
                 print(f"Warning: Could not load metadata: {e}")
                 self.documents = {}
         
-        # Load embeddings and index
-        if FAISS_AVAILABLE and self.embeddings_file.exists() and self.index_file.exists():
+        # Vectors from a different (or unrecorded) model cannot be compared with new query vectors.
+        # Without a model (e.g. it failed to load) the stored vectors are kept: re-embedding them
+        # with hash vectors would only throw them away.
+        model_changed = (self.embedding_model is not None
+                         and self._stored_embedding_model() != self.embedding_model_tag)
+        
+        # Load embeddings (with or without FAISS, so nothing is re-embedded) and index
+        if self.embeddings_file.exists() and not model_changed:
             try:
-                self.embeddings = np.load(self.embeddings_file)
-                self.index = faiss.read_index(str(self.index_file))
+                # Map the snapshot instead of reading it; copy-on-write so swap-remove
+                # deletes never touch the file
+                embeddings = np.load(self.embeddings_file, mmap_mode='c')
+                if len(embeddings) != len(self.documents):
+                    raise ValueError(f"{len(embeddings)} embeddings for {len(self.documents)} documents")
+                self._set_embeddings(embeddings)
                 
                 # Reconstruct doc_ids from metadata
                 self.doc_ids = list(self.documents.keys())
+                
+                if FAISS_AVAILABLE:
+                    if self.index_file.exists():
+                        self.index = faiss.read_index(str(self.index_file))
+                    if (self.index is None or not isinstance(self.index, faiss.IndexIDMap2)
+                            or self.index.metric_type != faiss.METRIC_INNER_PRODUCT):
+                        # No index saved (e.g. written without FAISS), or saved before documents
+                        # were keyed by id / before cosine similarity
+                        self._rebuild_index()
+                    self._set_nprobe()
             except Exception as e:
                 print(f"Warning: Could not load index: {e}")
-                self.embeddings = []
+                self._set_embeddings(None)
                 self.index = None
                 self.doc_ids = []
+        
+        self._reset_lookups()
+        self._replay_journal()
+        self._align_rows()
+        
+        if model_changed and self.documents:
+            print(f"Warning: Stored embeddings were not made by {self.embedding_model_tag}; re-embedding")
+            self._set_embeddings(None)  # Including any rows replayed from the journal
+            self._embedding_matrix()
+            if FAISS_AVAILABLE:
+                self._rebuild_index()
+                self._set_nprobe()
+            self.flush()
+    
+    def _stored_embedding_model(self) -> Optional[str]:
+        """Model recorded with the stored embeddings, or None if unknown"""
+        try:
+            return self.embedding_model_file.read_text(encoding='utf-8').strip()
+        except OSError:
+            return None
+    
+    def _record_embedding_model(self):
+        """Record the model that made the stored embeddings
+        
+        Nothing is recorded without a model, so hash vectors never replace the record of real ones
+        (and a store of hash vectors alone is re-embedded once a model is available).
+        """
+        if self.embedding_model is not None and not self._embedding_model_recorded:
+            self.embedding_model_file.write_text(self.embedding_model_tag, encoding='utf-8')
+            self._embedding_model_recorded = True
+    
+    def _replay_journal(self):
+        """Apply changes journaled since the last snapshot to the loaded store
+        
+        The journal is kept and keeps growing until the next periodic snapshot; it is only
+        compacted right away if its tail was torn, since later appends must line up with it.
+        """
+        if not self.journal_file.exists():
+            return
+        
+        # Rows can only be tracked if the snapshot embeddings were loaded (or there were none)
+        track_rows = len(self.doc_ids) == len(self.documents) == len(self.embeddings)
+        # Apply to the loaded index in place; without one, it is built once everything is replayed
+        update_index = FAISS_AVAILABLE and track_rows and self.index is not None
+        rows = np.empty((0, self.embedding_dim), dtype='float32')
+        if self.journal_embeddings_file.exists():
+            rows = np.fromfile(self.journal_embeddings_file, dtype='float32')
+            torn = len(rows) % self.embedding_dim
+            rows = rows[:len(rows) - torn].reshape(-1, self.embedding_dim)
+        else:
+            torn = 0
+        
+        applied = 0
+        next_row = 0
+        complete = False
+        try:
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = _json_loads(line)
+                    except ValueError:
+                        break  # Torn final write
+                    doc_id = entry['doc_id']
+                    if entry['op'] == 'add':
+                        if next_row >= len(rows):
+                            break  # Embedding row never made it to disk
+                        # Skip entries already in the snapshot (crash between snapshot and journal reset)
+                        if doc_id not in self.documents:
+                            self.documents[doc_id] = entry['doc']
+                            if track_rows:
+                                row = rows[next_row:next_row + 1]
+                                self._doc_rows[doc_id] = len(self.doc_ids)
+                                self.doc_ids.append(doc_id)
+                                self._append_embeddings(row)
+                                if update_index:
+                                    self.index.add_with_ids(row, self._faiss_id_array([doc_id]))
+                        next_row += 1
+                    elif entry['op'] == 'delete' and doc_id in self.documents:
+                        del self.documents[doc_id]
+                        self._drop_row(doc_id)
+                        if update_index:
+                            self.index.remove_ids(np.array([self._faiss_id(doc_id)], dtype='int64'))
+                    applied += 1
+                else:
+                    complete = not torn and next_row == len(rows)
+        except Exception as e:
+            print(f"Warning: Could not replay journal: {e}")
+        
+        if applied:
+            self._reset_lookups()
+            if update_index:
+                self._maybe_upgrade_index()
+            elif FAISS_AVAILABLE and track_rows:
+                self._rebuild_index()
+                self._set_nprobe()
+        self._journal_ops = applied
+        if not complete:
+            # Later entries would be appended after the torn tail and lost on the next replay
+            self.flush()
     
-    def _save_data(self):
-        """Save documents and index to disk"""
-        # Save metadata
+    def _append_journal(self, entries: List[Dict[str, Any]], embeddings: Optional[np.ndarray] = None):
+        """Record adds/deletes without rewriting the whole store; snapshot every SNAPSHOT_EVERY changes"""
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.documents, f, indent=2)
+            # Embedding rows first, so a journal line never refers to a missing row
+            if embeddings is not None and len(embeddings):
+                # A store with only a journal still needs to know which model made its rows
+                self._record_embedding_model()
+                with open(self.journal_embeddings_file, 'ab') as f:
+                    f.write(np.ascontiguousarray(embeddings, dtype='float32').tobytes())
+            with open(self.journal_file, 'ab') as f:
+                f.writelines(_json_dumps(entry) + b'\n' for entry in entries)
         except Exception as e:
-            print(f"Error saving metadata: {e}")
+            print(f"Error writing journal: {e}")
         
-        # Save embeddings and index
-        if FAISS_AVAILABLE and len(self.embeddings) > 0:
+        self._journal_ops += len(entries)
+        if self._journal_ops >= SNAPSHOT_EVERY:
+            self.flush()
+    
+    def flush(self) -> bool:
+        """Write a full snapshot (metadata, embeddings, index) and clear the journal
+        
+        The journal is kept if any part of the snapshot could not be written, so no change is lost.
+        """
+        with self._lock:
+            if not self._save_data():
+                return False
+        for path in (self.journal_file, self.journal_embeddings_file):
             try:
-                np.save(self.embeddings_file, np.array(self.embeddings))
-                if self.index is not None:
-                    faiss.write_index(self.index, str(self.index_file))
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                print(f"Error clearing journal: {e}")
+        self._journal_ops = 0
+        return True
+    
+    def close(self):
+        """Persist everything before shutdown"""
+        self.flush()
+        if self._embedding_cache:
+            self._embedding_cache.close()
+            self._embedding_cache = None
+    
+    def _align_rows(self):
+        """Give every document a row, so keyword scores and row lookups cover the whole store
+        
+        doc_ids falls behind documents when the snapshot embeddings could not be used; the
+        embeddings then cover only some documents and are recomputed on demand.
+        """
+        if len(self.doc_ids) != len(self.documents):
+            self.doc_ids = list(self.documents.keys())
+            self._set_embeddings(None)
+            self._reset_lookups()
+    
+    def _reset_lookups(self):
+        """Rebuild the doc_id -> row and FAISS id -> doc_id maps"""
+        self._doc_rows = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+        self._faiss_ids = {self._faiss_id(doc_id): doc_id for doc_id in self.documents}
+        self._posting_arrays = {}
+    
+    @staticmethod
+    def _faiss_id(doc_id: str) -> int:
+        """Stable non-negative 63-bit FAISS id for a document id"""
+        try:
+            raw = bytes.fromhex(doc_id)[:8]
+        except ValueError:
+            raw = hashlib.blake2b(doc_id.encode(), digest_size=8).digest()
+        return int.from_bytes(raw, 'big') & 0x7FFFFFFFFFFFFFFF
+    
+    def _faiss_id_array(self, doc_ids: List[str]) -> np.ndarray:
+        """FAISS ids for a list of document ids"""
+        return np.fromiter((self._faiss_id(doc_id) for doc_id in doc_ids), dtype='int64', count=len(doc_ids))
+    
+    def _set_nprobe(self):
+        """Apply the search-time nprobe (and HNSW quantizer efSearch) when the index is IVF-based"""
+        ivf = faiss.try_extract_index_ivf(self.index) if self.index is not None else None
+        if ivf is not None:
+            ivf.nprobe = IVF_NPROBE
+            quantizer = faiss.downcast_index(ivf.quantizer)
+            if isinstance(quantizer, faiss.IndexHNSW):
+                quantizer.hnsw.efSearch = HNSW_EF_SEARCH
+    
+    def _save_data(self) -> bool:
+        """Save documents and index to disk; returns False if any part could not be written"""
+        # Save embeddings (also without FAISS: the fallback search reuses them) and index first,
+        # so the metadata is only replaced once the vectors it refers to are on disk
+        if len(self.embeddings) > 0 and len(self.embeddings) == len(self.documents):
+            try:
+                if self._embeddings_mapped():
+                    # Rows still mapped from the old file keep it open, and Windows refuses to
+                    # replace an open file; move them into memory (dropping the mapping) first
+                    self._set_embeddings(np.array(self.embeddings))
+                # Write beside and rename, so a failed write leaves the old snapshot intact
+                tmp_file = self.embeddings_file.with_name(self.embeddings_file.name + '.tmp')
+                with open(tmp_file, 'wb') as f:
+                    np.save(f, self.embeddings)
+                os.replace(tmp_file, self.embeddings_file)
+                if FAISS_AVAILABLE and self.index is not None:
+                    tmp_file = self.index_file.with_name(self.index_file.name + '.tmp')
+                    faiss.write_index(self.index, str(tmp_file))
+                    os.replace(tmp_file, self.index_file)
+                self._record_embedding_model()
             except Exception as e:
                 print(f"Error saving index: {e}")
+                return False
+        
+        # Save metadata, in the same order as the saved embeddings (deletes reorder rows)
+        documents = self.documents
+        if len(self.doc_ids) == len(self.documents):
+            documents = {doc_id: self.documents[doc_id] for doc_id in self.doc_ids}
+        try:
+            tmp_file = self.metadata_file.with_name(self.metadata_file.name + '.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(_json_dumps(documents))
+            os.replace(tmp_file, self.metadata_file)
+        except Exception as e:
+            print(f"Error saving metadata: {e}")
+            return False
+        return True
     
     def _generate_doc_id(self, content: str, metadata: Dict) -> str:
-        """Generate unique document ID"""
-        unique_string = f"{content[:100]}{metadata.get('file_name', '')}{datetime.now().isoformat()}"
-        return hashlib.md5(unique_string.encode()).hexdigest()
+        """Content-addressed document ID (the same file name and content always map to the same ID)"""
+        data = content.encode() + b'|' + metadata.get('file_name', '').encode()
+        if BLAKE3_AVAILABLE:
+            return blake3.blake3(data).hexdigest()[:32]
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+    
+    def _hash_embedding(self, text: str) -> np.ndarray:
+        """Fallback: deterministic hash-based unit embedding (SHAKE-256 expanded to embedding_dim values)"""
+        hash_bytes = hashlib.shake_256(text.encode()).digest(self.embedding_dim * 4)
+        # One float32 buffer, scaled in place
+        embedding = np.frombuffer(hash_bytes, dtype=np.uint32).astype(np.float32)
+        embedding *= np.float32(1 / 2 ** 32)
+        embedding -= np.float32(0.5)
+        embedding /= np.linalg.norm(embedding) + np.float32(1e-8)
+        return embedding
     
-    def _get_embedding(self, text: str) -> np.ndarray:
-        """Get embedding for text"""
+    def _get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Get unit-length embeddings for many texts as one C-contiguous float32 (N, dim) matrix
+        
+        This is the only place dtype/layout are fixed, so FAISS and NumPy callers use the result as-is.
+        """
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype='float32')
         if self.embedding_model:
             try:
-                return self.embedding_model.encode(text, convert_to_numpy=True)
+                return np.ascontiguousarray(self.embedding_model.encode(
+                    texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True,
+                    normalize_embeddings=True, show_progress_bar=False
+                ), dtype='float32')
             except Exception as e:
-                print(f"Error generating embedding: {e}")
-        
-        # Fallback: simple hash-based embedding
-        hash_obj = hashlib.sha256(text.encode())
-        hash_bytes = hash_obj.digest()
-        # Use first embedding_dim bytes and pad if needed
-        embedding = np.frombuffer(hash_bytes[:self.embedding_dim], dtype=np.float32)
-        if len(embedding) < self.embedding_dim:
-            padding = np.zeros(self.embedding_dim - len(embedding), dtype=np.float32)
-            embedding = np.concatenate([embedding, padding])
-        return embedding[:self.embedding_dim]
+                print(f"Error generating embeddings: {e}")
+        # Hash embeddings are already unit length; fill the matrix row by row
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype='float32')
+        for row, text in enumerate(texts):
+            embeddings[row] = self._hash_embedding(text)
+        return embeddings
     
-    def add_document(self, content: str, metadata: Dict[str, Any]) -> str:
-        """Add a document to the knowledge base"""
-        doc_id = self._generate_doc_id(content, metadata)
+    def _get_document_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Like _get_embeddings, but reuses embeddings of previously seen document contents"""
+        cache = self._open_embedding_cache()
+        if cache is None:
+            return self._get_embeddings(texts)
         
-        # Store document
-        self.documents[doc_id] = {
-            'content': content,
-            'metadata': metadata,
-            'added_date': datetime.now().isoformat()
-        }
+        model_tag = type(self.embedding_model).__name__.encode()
+        keys = [hashlib.sha256(model_tag + b'\0' + text.encode('utf-8', 'surrogatepass')).hexdigest()
+                for text in texts]
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype='float32')
+        try:
+            found = {}
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), EMBEDDING_CACHE_LOOKUP_BATCH):
+                chunk = unique_keys[start:start + EMBEDDING_CACHE_LOOKUP_BATCH]
+                found.update(cache.execute(
+                    f"SELECT hash, vec FROM emb_cache WHERE dim = ? AND hash IN ({','.join('?' * len(chunk))})",
+                    [self.embedding_dim, *chunk]
+                ))
+            for row, key in enumerate(keys):
+                if key in found:
+                    embeddings[row] = np.frombuffer(found[key], dtype='float32')
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read embedding cache: {e}")
+            found = {}
         
-        # Generate embedding
-        embedding = self._get_embedding(content)
-        self.embeddings.append(embedding)
-        self.doc_ids.append(doc_id)
+        # Embed only the misses (each distinct content once), in one batch
+        misses = {}
+        for row, key in enumerate(keys):
+            if key not in found:
+                misses.setdefault(key, []).append(row)
+        if misses:
+            new_embeddings = self._get_embeddings([texts[rows[0]] for rows in misses.values()])
+            for embedding, rows in zip(new_embeddings, misses.values()):
+                embeddings[rows] = embedding
+            try:
+                cache.executemany(
+                    "INSERT OR REPLACE INTO emb_cache (hash, dim, vec) VALUES (?, ?, ?)",
+                    [(key, self.embedding_dim, embedding.tobytes())
+                     for key, embedding in zip(misses, new_embeddings)]
+                )
+                cache.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not update embedding cache: {e}")
+        return embeddings
+    
+    def _open_embedding_cache(self) -> Optional[sqlite3.Connection]:
+        """Connection to the embedding cache (None without a model: hash embeddings are cheaper than a lookup)"""
+        if not self.embedding_model or self._embedding_cache is False:
+            return None
+        if self._embedding_cache is None:
+            try:
+                # Gradio calls handlers from worker threads
+                self._embedding_cache = sqlite3.connect(self.embedding_cache_file, check_same_thread=False)
+                self._embedding_cache.execute(
+                    "CREATE TABLE IF NOT EXISTS emb_cache (hash TEXT PRIMARY KEY, dim INTEGER, vec BLOB)"
+                )
+            except sqlite3.Error as e:
+                print(f"Warning: Could not open embedding cache: {e}")
+                self._embedding_cache = False  # Don't retry on every add
+                return None
+        return self._embedding_cache
+    
+    def warmup(self):
+        """Run one tiny embedding and build the keyword and search indexes, so the first request does not pay for them"""
+        self._get_embeddings(["warmup"])
+        with self._lock:
+            self._ensure_postings()
+            if not self.documents:
+                return
+            # Whatever the first semantic search would otherwise build: the sign-bit prefilter or
+            # GPU copy of the FAISS index, or without FAISS, the embeddings of every document
+            if FAISS_AVAILABLE and self.index is not None:
+                if self._binary_index() is None:
+                    self._search_index()
+            else:
+                self._embedding_matrix()
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Get the embedding vector used for searching with this text"""
+        return self.embed_batch([text])[0]
+    
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Query embeddings for several texts; recently seen texts are reused, the rest encoded in one batch"""
+        cache = self._query_embeddings
+        # Hits are copied out under the lock, so another thread's eviction cannot remove them mid-use
+        found = {}
+        with self._query_embeddings_lock:
+            for text in dict.fromkeys(texts):
+                if text in cache:
+                    cache.move_to_end(text)
+                    found[text] = cache[text]
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        fresh = dict(zip(missing, self._get_embeddings(missing))) if missing else {}
+        found.update(fresh)
+        
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype='float32')
+        for row, text in enumerate(texts):
+            embeddings[row] = found[text]
+        
+        if fresh:
+            with self._query_embeddings_lock:
+                cache.update(fresh)
+                while len(cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                    cache.popitem(last=False)
+        return embeddings
+    
+    def add_document(self, content: str, metadata: Dict[str, Any]) -> str:
+        """Add a document to the knowledge base"""
+        return self.add_documents([(content, metadata)])[0]
+    
+    def add_documents(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Add several (content, metadata) documents with one batched embedding pass and one save"""
+        if not items:
+            return []
         
-        # Update FAISS index
-        if FAISS_AVAILABLE:
-            if self.index is None:
-                self.index = faiss.IndexFlatL2(self.embedding_dim)
+        with self._write_lock:
+            # New documents (re-ingested ones are already stored and embedded)
+            all_ids = []
+            new_docs = {}
+            for content, metadata in items:
+                doc_id = self._generate_doc_id(content, metadata)
+                all_ids.append(doc_id)
+                if doc_id in self.documents or doc_id in new_docs:
+                    continue
+                new_docs[doc_id] = {
+                    'content': content,
+                    'metadata': metadata,
+                    'added_date': datetime.now().isoformat()
+                }
+            if not new_docs:
+                return all_ids
+            doc_ids = list(new_docs)
+            
+            # Generate embeddings (searches keep running meanwhile; nothing shared has changed yet)
+            embeddings = self._get_document_embeddings([doc['content'] for doc in new_docs.values()])
+            
+            with self._lock:
+                self.documents.update(new_docs)
+                for doc_id in doc_ids:
+                    # Row first: the postings refer to documents by row
+                    self._doc_rows[doc_id] = len(self.doc_ids)
+                    self.doc_ids.append(doc_id)
+                    self._faiss_ids[self._faiss_id(doc_id)] = doc_id
+                    if self._postings is not None:
+                        self._index_terms(doc_id, new_docs[doc_id]['content'])
+                self._append_embeddings(embeddings)
+                
+                # Update FAISS index
+                if FAISS_AVAILABLE:
+                    if self.index is None:
+                        self.index = self._new_index()
+                    
+                    # Add to index
+                    self.index.add_with_ids(embeddings, self._faiss_id_array(doc_ids))
+                    if self._gpu_index is not None:
+                        self._gpu_index.add_with_ids(embeddings, self._faiss_id_array(doc_ids))
+                    if self._bin_index is not None:
+                        self._bin_index.add_with_ids(self._sign_bits(embeddings), self._faiss_id_array(doc_ids))
+                    self._maybe_upgrade_index()
+                # Only now that every index has the documents, so no result computed mid-update is cached as current
+                self.version += 1
             
-            # Add to index
-            embedding_2d = embedding.reshape(1, -1).astype('float32')
-            self.index.add(embedding_2d)
+            # Journal the new documents (full snapshots are written periodically)
+            self._append_journal(
+                [{'op': 'add', 'doc_id': doc_id, 'doc': self.documents[doc_id]} for doc_id in doc_ids],
+                embeddings
+            )
+            
+            return all_ids
+    
+    def _rebuild_index(self):
+        """Rebuild the FAISS index from the stored (normalized) embeddings"""
+        vectors = self.embeddings
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=np.isfinite(norms) & (norms > 0))
+        self._gpu_index = None
+        self.index = self._new_index()
+        if len(vectors):
+            self.index.add_with_ids(vectors, self._faiss_id_array(self.doc_ids))
+        self._maybe_upgrade_index()
+    
+    def _new_index(self):
+        """Empty index of the first tier"""
+        return faiss.IndexIDMap2(faiss.IndexScalarQuantizer(
+            self.embedding_dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        ))
+    
+    def _maybe_upgrade_index(self):
+        """Move the index to the next compression tier once the corpus is large enough to train it"""
+        current = faiss.downcast_index(self.index.index)
+        if not isinstance(current, (faiss.IndexFlat, faiss.IndexScalarQuantizer)):
+            return
+        count = len(self.embeddings)
+        nlist = _ivf_nlist(count)
+        if count < IVF_TRAIN_FACTOR * max(nlist, 2 ** PQ_BITS) or self.embedding_dim % PQ_SUBQUANTIZERS:
+            is_sq8 = (isinstance(current, faiss.IndexScalarQuantizer)
+                      and current.sq.qtype == faiss.ScalarQuantizer.QT_8bit)
+            if is_sq8 or count < SQ_MIN_TRAIN:
+                return
+            index = faiss.IndexScalarQuantizer(self.embedding_dim, faiss.ScalarQuantizer.QT_8bit,
+                                               faiss.METRIC_INNER_PRODUCT)
         else:
-            # Simple list-based storage
-            pass
+            quantizer = faiss.IndexHNSWFlat(self.embedding_dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            quantizer.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index = faiss.IndexIVFPQ(quantizer, self.embedding_dim, nlist, PQ_SUBQUANTIZERS, PQ_BITS,
+                                     faiss.METRIC_INNER_PRODUCT)
         
-        # Save to disk
-        self._save_data()
+        vectors = self.embeddings
+        index.train(vectors)
+        self._gpu_index = None
+        self.index = faiss.IndexIDMap2(index)
+        self.index.add_with_ids(vectors, self._faiss_id_array(self.doc_ids))
+        self._set_nprobe()
+    
+    def _search_index(self):
+        """Index to search: a GPU copy of the FAISS index for large corpora, otherwise the index itself"""
+        if self._gpu_index is None and self._use_gpu and self.index.ntotal >= GPU_MIN_DOCS:
+            try:
+                if self._gpu_resources is None:
+                    self._gpu_resources = faiss.StandardGpuResources()
+                self._gpu_index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, self._gpu_source_index())
+            except Exception as e:
+                print(f"Warning: Could not move FAISS index to GPU, searching on CPU: {e}")
+                self._use_gpu = False
+        return self._gpu_index if self._gpu_index is not None else self.index
+    
+    def _gpu_source_index(self):
+        """CPU index to copy to the GPU
         
-        return doc_id
+        GPU IVF indexes only take a flat coarse quantizer, so for IVF-PQ a clone is made with
+        the HNSW quantizer replaced by a flat one over the same centroids.
+        """
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is None or not isinstance(faiss.downcast_index(ivf.quantizer), faiss.IndexHNSW):
+            return self.index
+        index = faiss.clone_index(self.index)
+        ivf = faiss.extract_index_ivf(index)
+        hnsw = faiss.downcast_index(ivf.quantizer)
+        flat = faiss.IndexFlat(ivf.d, ivf.metric_type)
+        flat.add(hnsw.reconstruct_n(0, hnsw.ntotal))
+        ivf.quantizer = flat
+        flat.this.disown()  # Freed by the clone, which owns its quantizer
+        hnsw.this.own(True)  # The replaced quantizer is freed with this proxy
+        return index
     
     def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a document by ID"""
@@ -162,120 +794,319 @@ class KnowledgeBase:
     
     def semantic_search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Perform semantic search using vector similarity"""
-        if len(self.documents) == 0:
-            return []
-        
-        # Get query embedding
-        query_embedding = self._get_embedding(query)
+        return self.semantic_search_batch([query], top_k=top_k)[0]
+    
+    def semantic_search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """Perform semantic search for several queries at once, returning one result list per query"""
+        if len(self.documents) == 0 or not queries:
+            return [[] for _ in queries]
         
+        # Get query embeddings as one matrix
+        query_embeddings = self.embed_batch(queries)
+        with self._lock:
+            return self._search_embeddings(query_embeddings, top_k)
+    
+    def _search_embeddings(self, query_embeddings: np.ndarray, top_k: int) -> List[List[Dict[str, Any]]]:
+        """Nearest documents for each row of a (Q, dim) matrix of unit-length query embeddings"""
         if FAISS_AVAILABLE and self.index is not None:
-            # Use FAISS for fast search
-            query_embedding_2d = query_embedding.reshape(1, -1).astype('float32')
-            distances, indices = self.index.search(query_embedding_2d, min(top_k, len(self.doc_ids)))
+            if self._binary_index() is not None:
+                return self._prefiltered_search(query_embeddings, top_k)
             
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx < len(self.doc_ids):
-                    doc_id = self.doc_ids[idx]
-                    doc = self.documents[doc_id]
-                    distance = float(distances[0][i])
-                    # Convert distance to similarity score (lower distance = higher similarity)
-                    score = 1.0 / (1.0 + distance)
-                    results.append({
-                        'content': doc['content'],
-                        'metadata': doc['metadata'],
-                        'score': score
-                    })
-            return results
+            # Use FAISS for fast search; all queries share one index traversal
+            index = self._search_index()
+            distances, ids = index.search(query_embeddings, min(top_k, index.ntotal))
+            
+            batch_results = []
+            for row_distances, row_ids in zip(distances, ids):
+                results = []
+                for distance, faiss_id in zip(row_distances, row_ids):
+                    doc_id = self._faiss_ids.get(int(faiss_id))
+                    if doc_id is not None:
+                        # Inner product of unit vectors is already the cosine similarity
+                        results.append(self._search_result(doc_id, distance))
+                batch_results.append(results)
+            return batch_results
         else:
-            # Fallback: simple cosine similarity
-            results = []
-            for doc_id, doc in self.documents.items():
-                doc_embedding = self._get_embedding(doc['content'])
-                # Cosine similarity
-                similarity = np.dot(query_embedding, doc_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding) + 1e-8
-                )
-                results.append({
-                    'content': doc['content'],
-                    'metadata': doc['metadata'],
-                    'score': float(similarity)
-                })
+            # Fallback: cosine similarity of every query against every document
+            # (stored embeddings are unit length, so one matrix product gives all scores)
+            doc_embeddings = self._embedding_matrix()
+            similarities = query_embeddings @ doc_embeddings.T
             
-            # Sort by score and return top_k
-            results.sort(key=lambda x: x['score'], reverse=True)
-            return results[:top_k]
+            batch_results = []
+            for row in similarities:
+                results = []
+                for idx in self._top_k_indices(row, top_k):
+                    results.append(self._search_result(self.doc_ids[idx], row[idx]))
+                batch_results.append(results)
+            return batch_results
+    
+    def _search_result(self, doc_id: str, score: float) -> Dict[str, Any]:
+        """Search result entry for a document"""
+        doc = self.documents[doc_id]
+        return {
+            'doc_id': doc_id,
+            'content': doc['content'],
+            'metadata': doc['metadata'],
+            'score': float(score)
+        }
+    
+    @staticmethod
+    def _sign_bits(vectors: np.ndarray) -> np.ndarray:
+        """Binary-quantize embeddings: one bit per dimension (positive or not), packed into bytes"""
+        return np.packbits(vectors > 0, axis=-1)
+    
+    def _binary_index(self):
+        """Sign-bit companion index for the Hamming prefilter (None below BINARY_PREFILTER_MIN_DOCS)"""
+        if self._emb_n < BINARY_PREFILTER_MIN_DOCS or self._emb_n != len(self.doc_ids):
+            return None
+        if self._bin_index is None:
+            index = faiss.IndexBinaryIDMap2(faiss.IndexBinaryFlat(self.embedding_dim))
+            embeddings = self.embeddings
+            for start in range(0, len(embeddings), BINARY_PACK_ROWS):
+                stop = start + BINARY_PACK_ROWS
+                index.add_with_ids(self._sign_bits(embeddings[start:stop]),
+                                   self._faiss_id_array(self.doc_ids[start:stop]))
+            self._bin_index = index
+        return self._bin_index
+    
+    def _prefiltered_search(self, query_embeddings: np.ndarray, top_k: int) -> List[List[Dict[str, Any]]]:
+        """Shortlist by Hamming distance over sign bits, then rank the shortlist by exact cosine similarity"""
+        binary_index = self._binary_index()
+        shortlist = min(top_k * BINARY_PREFILTER_OVERSAMPLE, binary_index.ntotal)
+        _, ids = binary_index.search(self._sign_bits(query_embeddings), shortlist)
+        
+        embeddings = self.embeddings
+        batch_results = []
+        for query_embedding, row_ids in zip(query_embeddings, ids):
+            doc_ids = [doc_id for doc_id in (self._faiss_ids.get(int(faiss_id)) for faiss_id in row_ids)
+                       if doc_id is not None]
+            rows = np.fromiter((self._doc_rows[doc_id] for doc_id in doc_ids), dtype=np.intp, count=len(doc_ids))
+            scores = embeddings[rows] @ query_embedding
+            batch_results.append([self._search_result(doc_ids[idx], scores[idx])
+                                  for idx in self._top_k_indices(scores, top_k)])
+        return batch_results
+    
+    def _embedding_matrix(self) -> np.ndarray:
+        """Stored document embeddings as one (N, dim) matrix aligned with doc_ids"""
+        if len(self.doc_ids) != len(self.documents) or len(self.embeddings) != len(self.doc_ids):
+            # Embeddings were not loaded (e.g. no FAISS); embed every document once
+            self.doc_ids = list(self.documents.keys())
+            self._set_embeddings(self._get_document_embeddings(
+                [self.documents[doc_id]['content'] for doc_id in self.doc_ids]
+            ))
+            self._reset_lookups()
+        return self.embeddings
+    
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Stored embeddings as an (N, dim) view, row i belonging to doc_ids[i]"""
+        return self._emb_mat[:self._emb_n]
+    
+    def _embeddings_mapped(self) -> bool:
+        """Whether the stored embeddings are still backed by the memory-mapped snapshot file"""
+        array = self._emb_mat
+        while array is not None:
+            if isinstance(array, np.memmap):
+                return True
+            array = getattr(array, 'base', None)
+        return False
+    
+    def _set_embeddings(self, matrix: Optional[np.ndarray]):
+        """Replace the stored embeddings (None clears them); the matrix is used without copying"""
+        if matrix is None:
+            matrix = np.empty((0, self.embedding_dim), dtype='float32')
+        self._emb_mat = np.asarray(matrix, dtype='float32').reshape(-1, self.embedding_dim)
+        self._emb_n = len(self._emb_mat)
+    
+    def _append_embeddings(self, rows: np.ndarray):
+        """Append embedding rows, growing the matrix geometrically when it is full"""
+        needed = self._emb_n + len(rows)
+        if needed > len(self._emb_mat):
+            grown = np.empty((max(2 * len(self._emb_mat), needed, EMBEDDING_INITIAL_CAPACITY),
+                              self.embedding_dim), dtype='float32')
+            grown[:self._emb_n] = self.embeddings
+            self._emb_mat = grown
+        self._emb_mat[self._emb_n:needed] = rows
+        self._emb_n = needed
+    
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Indices of the top_k scores, best first (linear-time selection, then sort only k)"""
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind='stable')]
     
     def keyword_search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Perform keyword-based search"""
-        if len(self.documents) == 0:
-            return []
-        
-        query_lower = query.lower()
-        query_terms = query_lower.split()
-        
-        results = []
-        for doc_id, doc in self.documents.items():
-            content_lower = doc['content'].lower()
-            # Count matching terms
-            matches = sum(1 for term in query_terms if term in content_lower)
-            if matches > 0:
-                score = matches / len(query_terms) if query_terms else 0
+        with self._lock:
+            scores = self._keyword_scores(query)
+            best = scores.max(initial=0.0)
+            if best <= 0:
+                return []
+            
+            results = []
+            for row in self._top_k_indices(scores, min(top_k, np.count_nonzero(scores))):
+                doc_id = self.doc_ids[row]
+                doc = self.documents[doc_id]
                 results.append({
+                    'doc_id': doc_id,
                     'content': doc['content'],
                     'metadata': doc['metadata'],
-                    'score': score
+                    # Scaled so the best match scores 1.0, comparable with cosine scores in hybrid_search
+                    'score': float(scores[row] / best)
                 })
+            return results
+    
+    def _keyword_scores(self, query: str) -> np.ndarray:
+        """Raw TF-IDF score of every document by row of doc_ids (0 if it contains no query term)"""
+        if len(self.documents) == 0:
+            return np.zeros(len(self.doc_ids), dtype=np.float64)
         
-        # Sort by score
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:top_k]
+        query_terms = list(dict.fromkeys(_TOKEN_RE.findall(query.lower())))
+        postings = [arrays for arrays in map(self._term_arrays, query_terms) if arrays is not None]
+        
+        # TF-IDF over the postings of the query terms only, one vectorized update per term
+        # (sized once the postings are read, so every row they name fits)
+        scores = np.zeros(len(self.doc_ids), dtype=np.float64)
+        doc_count = len(self.documents)
+        for rows, tfs in postings:
+            scores[rows] += tfs * math.log(1 + doc_count / len(rows))
+        return scores
+    
+    def _term_arrays(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """A term's postings as (rows, term frequencies) arrays, cached until they change"""
+        arrays = self._posting_arrays.get(term)
+        if arrays is None:
+            version = self.version
+            term_postings = self._ensure_postings().get(term)
+            if not term_postings:
+                return None
+            entries = tuple(term_postings.items())  # Snapshot; a write may add to the dict meanwhile
+            count = len(entries)
+            arrays = (
+                np.fromiter((self._doc_rows[doc_id] for doc_id, _ in entries), dtype=np.intp, count=count),
+                np.fromiter((tf for _, tf in entries), dtype=np.float64, count=count)
+            )
+            if version == self.version:  # Arrays built across a write may already be stale
+                self._posting_arrays[term] = arrays
+        return arrays
+    
+    @staticmethod
+    def _term_counts(content: str) -> Counter:
+        """Term frequencies of a text for the keyword index"""
+        return Counter(_TOKEN_RE.findall(content.lower()))
+    
+    def _ensure_postings(self) -> Dict[str, Dict[str, int]]:
+        """Build the inverted index on first use; afterwards it is kept up to date incrementally"""
+        if self._postings is None:
+            self._postings = {}
+            for doc_id, doc in self.documents.items():
+                self._index_terms(doc_id, doc['content'])
+        return self._postings
+    
+    def _index_terms(self, doc_id: str, content: str):
+        """Add a document's terms to the inverted index"""
+        for term, tf in self._term_counts(content).items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+            self._posting_arrays.pop(term, None)
+    
+    def _unindex_terms(self, doc_id: str, content: str):
+        """Remove a document's terms from the inverted index"""
+        for term in self._term_counts(content):
+            self._posting_arrays.pop(term, None)
+            term_postings = self._postings.get(term)
+            if term_postings is not None:
+                term_postings.pop(doc_id, None)
+                if not term_postings:
+                    del self._postings[term]
     
     def hybrid_search(self, query: str, top_k: int = 5, alpha: float = 0.7) -> List[Dict[str, Any]]:
         """Perform hybrid search combining semantic and keyword search"""
-        semantic_results = self.semantic_search(query, top_k * 2)
-        keyword_results = self.keyword_search(query, top_k * 2)
-        
-        # Combine and re-rank
-        combined = {}
-        for result in semantic_results:
-            doc_id = result['metadata'].get('file_name', '')
-            if doc_id not in combined:
-                combined[doc_id] = result.copy()
-                combined[doc_id]['score'] = alpha * result['score']
-            else:
-                combined[doc_id]['score'] += alpha * result['score']
+        if len(self.documents) == 0:
+            return []
         
-        for result in keyword_results:
-            doc_id = result['metadata'].get('file_name', '')
-            if doc_id not in combined:
-                combined[doc_id] = result.copy()
-                combined[doc_id]['score'] = (1 - alpha) * result['score']
-            else:
-                combined[doc_id]['score'] += (1 - alpha) * result['score']
+        # Hash fallback embeddings carry no meaning, so only the keyword branch is useful without a model
+        query_embedding = self.embed_batch([query]) if self.embedding_model else None
         
-        # Sort by combined score
-        results = list(combined.values())
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:top_k]
+        with self._lock:
+            # Candidates: the best semantic and keyword matches, keyed by doc_id (file names can repeat)
+            candidates = []
+            if query_embedding is not None:
+                candidates.extend(result['doc_id'] for result in
+                                  self._search_embeddings(query_embedding, top_k * 2)[0])
+            # Scored after the semantic search, which may (re)load the rows keyword scores are aligned with
+            keyword_scores = self._keyword_scores(query)
+            candidates.extend(self.doc_ids[row] for row in
+                              self._top_k_indices(keyword_scores, min(top_k * 2, np.count_nonzero(keyword_scores))))
+            candidates = list(dict.fromkeys(candidates))
+            if not candidates:
+                return []
+            
+            # Re-rank every candidate on both signals at once
+            # (keyword scores scaled so the best match is 1.0; exact cosine from the stored unit vectors)
+            rows = np.fromiter((self._doc_rows[doc_id] for doc_id in candidates), dtype=np.intp,
+                               count=len(candidates))
+            combined = (1 - alpha) * keyword_scores[rows] / (keyword_scores.max(initial=0.0) or 1.0)
+            if query_embedding is not None:
+                combined += alpha * (self._embedding_matrix()[rows] @ query_embedding[0])
+            
+            results = []
+            for idx in self._top_k_indices(combined, top_k):
+                doc = self.documents[candidates[idx]]
+                results.append({
+                    'doc_id': candidates[idx],
+                    'content': doc['content'],
+                    'metadata': doc['metadata'],
+                    'score': float(combined[idx])
+                })
+            return results
     
     def get_all_documents(self) -> List[Dict[str, Any]]:
         """Get all documents in the knowledge base"""
-        return list(self.documents.values())
+        with self._lock:
+            return list(self.documents.values())
     
     def delete_document(self, doc_id: str) -> bool:
         """Delete a document from the knowledge base"""
-        if doc_id in self.documents:
-            del self.documents[doc_id]
-            
-            # Remove from index (simplified - would need proper index management)
-            if doc_id in self.doc_ids:
-                idx = self.doc_ids.index(doc_id)
-                self.doc_ids.pop(idx)
-                if len(self.embeddings) > idx:
-                    self.embeddings.pop(idx)
-            
-            self._save_data()
-            return True
-        return False
+        with self._write_lock:
+            if doc_id in self.documents:
+                with self._lock:
+                    if self._postings is not None:
+                        self._unindex_terms(doc_id, self.documents[doc_id]['content'])
+                    del self.documents[doc_id]
+                    
+                    # Remove the vector from the index so it can no longer be returned
+                    faiss_id = self._faiss_id(doc_id)
+                    self._faiss_ids.pop(faiss_id, None)
+                    if FAISS_AVAILABLE and self.index is not None:
+                        self.index.remove_ids(np.array([faiss_id], dtype='int64'))
+                        self._gpu_index = None  # GPU indexes do not support removal; recopied on next search
+                    if self._bin_index is not None:
+                        self._bin_index.remove_ids(np.array([faiss_id], dtype='int64'))
+                    
+                    self._drop_row(doc_id)
+                    self.version += 1
+                self._append_journal([{'op': 'delete', 'doc_id': doc_id}])
+                return True
+            return False
+    
+    def _drop_row(self, doc_id: str):
+        """Drop a document's row by moving the last row into its place (O(1))"""
+        row = self._doc_rows.pop(doc_id, None)
+        if row is None:
+            return
+        last = len(self.doc_ids) - 1
+        if self._emb_n != len(self.doc_ids):
+            self._set_embeddings(None)  # Not loaded; recomputed on demand
+        elif row != last:
+            self._emb_mat[row] = self._emb_mat[last]
+        if row != last:
+            self.doc_ids[row] = self.doc_ids[last]
+            self._doc_rows[self.doc_ids[row]] = row
+            self._posting_arrays = {}  # Cached posting rows of the moved document are stale
+        self.doc_ids.pop()
+        if self._emb_n:
+            self._emb_n -= 1
 
@@ -88,6 +88,7 @@ if ($LASTEXITCODE -ne 0) {
 # Check if required files exist
 $requiredFiles = @(
     "main.py",
+    "app.py",
     "document_processor.py",
     "knowledge_base.py",
     "ai_analyzer.py"